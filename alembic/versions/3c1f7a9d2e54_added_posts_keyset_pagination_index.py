@@ -0,0 +1,29 @@
+"""Added posts keyset pagination index
+
+Revision ID: 3c1f7a9d2e54
+Revises: b98c18aae5e6
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f7a9d2e54'
+down_revision = 'b98c18aae5e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_posts_board_id_created_at_post_id',
+        'posts',
+        ['board_id', 'created_at', 'post_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_board_id_created_at_post_id', table_name='posts')
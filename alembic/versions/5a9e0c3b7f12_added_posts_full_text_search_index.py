@@ -0,0 +1,37 @@
+"""Added posts full-text search index
+
+Revision ID: 5a9e0c3b7f12
+Revises: 8e2b4d6f1a37
+Create Date: 2026-10-18 13:40:52.117093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9e0c3b7f12'
+down_revision = '8e2b4d6f1a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # must match models.post_search_document() exactly
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_posts_search ON posts
+            USING gin (
+                to_tsvector(
+                    'simple'::regconfig,
+                    (coalesce(title, '') || ' ') || coalesce(content, '')
+                )
+            )
+            """
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_posts_search")
@@ -0,0 +1,48 @@
+"""Added post_count column to boards table
+
+Revision ID: 8e2b4d6f1a37
+Revises: 3c1f7a9d2e54
+Create Date: 2026-10-18 11:02:15.604731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2b4d6f1a37'
+down_revision = '3c1f7a9d2e54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'boards',
+        sa.Column('post_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    # backfill from the live (not soft-deleted) posts
+    op.execute(
+        """
+        UPDATE boards
+        SET post_count = counts.post_count
+        FROM (
+            SELECT board_id, count(*) AS post_count
+            FROM posts
+            WHERE is_deleted IS NOT TRUE
+            GROUP BY board_id
+        ) AS counts
+        WHERE boards.board_id = counts.board_id
+        """
+    )
+    op.create_index(
+        'ix_boards_post_count_board_id',
+        'boards',
+        ['post_count', 'board_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_boards_post_count_board_id', table_name='boards')
+    op.drop_column('boards', 'post_count')
@@ -0,0 +1,159 @@
+"""Partitioned posts by month
+
+Revision ID: a3f6c9e1d7b4
+Revises: e5d8a2c61f90
+Create Date: 2026-10-18 20:05:13.582941
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f6c9e1d7b4'
+down_revision = 'e5d8a2c61f90'
+branch_labels = None
+depends_on = None
+
+# partitions created past the newest post, see utils.partitions.PostPartitions
+MONTHS_AHEAD = 3
+
+POST_COLUMNS = 'post_id, title, content, created_at, is_deleted, author_id, board_id, version'
+
+# idempotent, serialized with an advisory lock so every API worker can call it
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_posts_partitions(first_month timestamp, last_month timestamp)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    bound timestamp := date_trunc('month', first_month);
+    partition_name text;
+    created integer := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_posts_partitions'));
+    WHILE bound <= date_trunc('month', last_month) LOOP
+        partition_name := 'posts_p' || to_char(bound, 'YYYY_MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF posts FOR VALUES FROM (%L) TO (%L)',
+                partition_name, bound, bound + interval '1 month'
+            );
+            created := created + 1;
+        END IF;
+        bound := bound + interval '1 month';
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+
+def create_indexes() -> None:
+    # same names as models.Post; on a partitioned table each one is created
+    # on every partition, present and future
+    op.create_index('ix_posts_post_id', 'posts', ['post_id'], unique=False)
+    op.create_index('ix_posts_title', 'posts', ['title'], unique=False)
+    op.create_index(
+        'ix_posts_board_id_created_at_post_id_live',
+        'posts',
+        ['board_id', 'created_at', 'post_id'],
+        unique=False,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+    # must match models.post_search_document() exactly
+    op.execute(
+        """
+        CREATE INDEX ix_posts_search ON posts
+        USING gin (
+            to_tsvector(
+                'simple'::regconfig,
+                (coalesce(title, '') || ' ') || coalesce(content, '')
+            )
+        )
+        """
+    )
+
+
+def drop_indexes() -> None:
+    for name in (
+        'ix_posts_search',
+        'ix_posts_board_id_created_at_post_id_live',
+        'ix_posts_title',
+        'ix_posts_post_id',
+    ):
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+def upgrade() -> None:
+    # rewrites the whole table: writes to posts are blocked until it commits,
+    # run it in a maintenance window
+    op.execute('LOCK TABLE posts IN ACCESS EXCLUSIVE MODE')
+    drop_indexes()
+    op.execute('ALTER TABLE posts RENAME TO posts_unpartitioned')
+    op.execute('ALTER TABLE posts_unpartitioned RENAME CONSTRAINT posts_pkey TO posts_unpartitioned_pkey')
+    op.execute('ALTER SEQUENCE posts_post_id_seq OWNED BY NONE')
+
+    # the partition key has to be part of the primary key
+    op.execute(
+        """
+        CREATE TABLE posts (
+            post_id integer NOT NULL DEFAULT nextval('posts_post_id_seq'::regclass),
+            title varchar NOT NULL,
+            content varchar,
+            created_at timestamp without time zone NOT NULL,
+            is_deleted boolean,
+            author_id integer REFERENCES users (id),
+            board_id integer REFERENCES boards (board_id),
+            version integer NOT NULL DEFAULT 1,
+            CONSTRAINT posts_pkey PRIMARY KEY (post_id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute('ALTER SEQUENCE posts_post_id_seq OWNED BY posts.post_id')
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    op.execute(
+        f"""
+        SELECT create_posts_partitions(
+            coalesce((SELECT min(created_at) FROM posts_unpartitioned), now()::timestamp),
+            greatest(
+                (SELECT max(created_at) FROM posts_unpartitioned),
+                now()::timestamp
+            ) + interval '{MONTHS_AHEAD} months'
+        )
+        """
+    )
+
+    op.execute(f'INSERT INTO posts ({POST_COLUMNS}) SELECT {POST_COLUMNS} FROM posts_unpartitioned')
+    op.execute('DROP TABLE posts_unpartitioned')
+    # indexes are built once the rows are in, far faster than row by row
+    create_indexes()
+    op.execute('ANALYZE posts')
+
+
+def downgrade() -> None:
+    # detached and archived partitions are not brought back
+    op.execute('LOCK TABLE posts IN ACCESS EXCLUSIVE MODE')
+    drop_indexes()
+    op.execute('ALTER TABLE posts RENAME TO posts_partitioned')
+    op.execute('ALTER TABLE posts_partitioned RENAME CONSTRAINT posts_pkey TO posts_partitioned_pkey')
+    op.execute('ALTER SEQUENCE posts_post_id_seq OWNED BY NONE')
+    op.execute(
+        """
+        CREATE TABLE posts (
+            post_id integer NOT NULL DEFAULT nextval('posts_post_id_seq'::regclass),
+            title varchar NOT NULL,
+            content varchar,
+            created_at timestamp without time zone NOT NULL,
+            is_deleted boolean,
+            author_id integer REFERENCES users (id),
+            board_id integer REFERENCES boards (board_id),
+            version integer NOT NULL DEFAULT 1,
+            CONSTRAINT posts_pkey PRIMARY KEY (post_id)
+        )
+        """
+    )
+    op.execute('ALTER SEQUENCE posts_post_id_seq OWNED BY posts.post_id')
+    op.execute(f'INSERT INTO posts ({POST_COLUMNS}) SELECT {POST_COLUMNS} FROM posts_partitioned')
+    op.execute('DROP TABLE posts_partitioned')
+    op.execute('DROP FUNCTION IF EXISTS create_posts_partitions(timestamp, timestamp)')
+    create_indexes()
+    op.execute('ANALYZE posts')
@@ -0,0 +1,85 @@
+"""Added partial indexes for hot queries
+
+Revision ID: c47d19e8b2a6
+Revises: 5a9e0c3b7f12
+Create Date: 2026-10-18 15:21:07.442518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47d19e8b2a6'
+down_revision = '5a9e0c3b7f12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # built concurrently so live tables stay writable; the unique email
+    # index fails if duplicate emails already exist and must be cleaned first
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_board_id_created_at_post_id_live',
+            'posts',
+            ['board_id', 'created_at', 'post_id'],
+            unique=False,
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_posts_board_id_created_at_post_id',
+            table_name='posts',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_boards_creator_id_post_count_live',
+            'boards',
+            ['creator_id', 'post_count', 'board_id'],
+            unique=False,
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_boards_post_count_public_live',
+            'boards',
+            ['post_count', 'board_id'],
+            unique=False,
+            postgresql_where=sa.text('is_public = true AND is_deleted = false'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_users_email',
+            'users',
+            ['email'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_email', table_name='users', postgresql_concurrently=True)
+        op.drop_index(
+            'ix_boards_post_count_public_live',
+            table_name='boards',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_boards_creator_id_post_count_live',
+            table_name='boards',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_posts_board_id_created_at_post_id',
+            'posts',
+            ['board_id', 'created_at', 'post_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_posts_board_id_created_at_post_id_live',
+            table_name='posts',
+            postgresql_concurrently=True,
+        )
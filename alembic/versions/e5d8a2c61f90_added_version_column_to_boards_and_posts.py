@@ -0,0 +1,33 @@
+"""Added version column to boards and posts
+
+Revision ID: e5d8a2c61f90
+Revises: c47d19e8b2a6
+Create Date: 2026-10-18 19:12:40.318265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5d8a2c61f90'
+down_revision = 'c47d19e8b2a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # constant defaults: no table rewrite on Postgres 11+
+    op.add_column(
+        'boards',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+    op.add_column(
+        'posts',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'version')
+    op.drop_column('boards', 'version')
@@ -0,0 +1,377 @@
+"""End-to-end API throughput and latency, in process.
+
+Boots the FastAPI app on an httpx ASGI transport (no network, no uvicorn)
+against DB_URL, or a scratch SQLite file when DB_URL is unset, with Redis
+replaced by fakeredis. Seeds `--users`/`--boards`/`--posts`, then
+`--concurrency` clients issue `--requests` requests drawn from a weighted mix
+of the users, boards and posts endpoints. Prints throughput and p50/p95/p99
+per endpoint and writes them to `--output` as JSON.
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/bench_api.py --posts 50000 --concurrency 32 --requests 5000
+    python benchmarks/bench_api.py --baseline before.json --max-regression 0.2
+
+With `--baseline`, exits non-zero when an endpoint's p95 got worse than the
+baseline's by more than `--max-regression` (a fraction).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "src"))
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), "bench_api.db")
+os.environ.setdefault("DB_URL", f"sqlite+aiosqlite:///{SCRATCH_DB}")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+# every simulated client shares one address and would trip the login limit
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+import fakeredis
+import httpx
+from sqlalchemy import insert, select
+
+import main
+from database import engine, session_create
+from models import Base, Board, Post, User, init_db
+from services.boards import BoardService
+from services.users import UserService
+from utils.redis_manager import InstrumentedRedis, RedisManager
+
+PASSWORD = "bench-password"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Dataset:
+    """Ids the scenarios pick from; each client acts as one seeded user."""
+
+    def __init__(self):
+        self.users = []  # (user_id, email, token)
+        self.public_boards = []
+        self.boards_by_creator = defaultdict(list)
+        self.posts_by_author = defaultdict(list)
+
+    def readable_boards(self, user_id):
+        return self.public_boards + self.boards_by_creator[user_id]
+
+
+async def seed(args, data):
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+    await init_db(engine)
+
+    hashed = await UserService.get_password_hash(PASSWORD)
+    rng = random.Random(args.seed)
+    tag = f"{int(time.time())}-{rng.randrange(10**6)}"
+    async with session_create() as db:
+        await db.execute(
+            insert(User),
+            [
+                {
+                    "fullname": f"bench user {i}",
+                    "email": f"bench-{tag}-{i}@example.com",
+                    "hash_password": hashed,
+                }
+                for i in range(args.users)
+            ],
+        )
+        users = (
+            await db.execute(
+                select(User.id, User.email).where(User.email.like(f"bench-{tag}-%"))
+            )
+        ).all()
+
+        boards = [
+            {
+                "name": f"bench-{tag}-{i}",
+                "is_public": rng.random() < args.public_ratio,
+                "is_deleted": False,
+                "creator_id": rng.choice(users).id,
+            }
+            for i in range(args.boards)
+        ]
+        await db.execute(insert(Board), boards)
+        boards = (
+            await db.execute(
+                select(Board.board_id, Board.is_public, Board.creator_id).where(
+                    Board.name.like(f"bench-{tag}-%")
+                )
+            )
+        ).all()
+        for board in boards:
+            if board.is_public:
+                data.public_boards.append(board.board_id)
+            else:
+                data.boards_by_creator[board.creator_id].append(board.board_id)
+
+        now = datetime.now()
+        for offset in range(0, args.posts, 5000):
+            rows = []
+            for i in range(offset, min(offset + 5000, args.posts)):
+                user = rng.choice(users)
+                board_id = rng.choice(
+                    data.public_boards + data.boards_by_creator[user.id]
+                )
+                rows.append(
+                    {
+                        "title": f"post {i}",
+                        "content": "lorem ipsum " * rng.randint(2, 40),
+                        "created_at": now - timedelta(seconds=args.posts - i),
+                        "is_deleted": False,
+                        "author_id": user.id,
+                        "board_id": board_id,
+                    }
+                )
+            await db.execute(insert(Post), rows)
+        await db.commit()
+
+        posts = await db.execute(
+            select(Post.post_id, Post.author_id, Post.board_id).where(
+                Post.board_id.in_([board.board_id for board in boards])
+            )
+        )
+        for post in posts:
+            data.posts_by_author[post.author_id].append(post.post_id)
+
+        # keep /boards/list ranking meaningful
+        await BoardService.recount_post_counts(db)
+
+    for user in users:
+        token = await UserService.create_access_token(
+            data={"sub": user.id}, expires_delta=timedelta(hours=1)
+        )
+        data.users.append((user.id, user.email, token))
+
+
+def scenarios(data, rng, searchable):
+    """(name, weight, request factory); a factory returns None to skip."""
+
+    def list_boards(user):
+        return "GET", "/boards/list", {"params": {"size": 20}}
+
+    def get_board(user):
+        return "GET", f"/boards/get/{rng.choice(data.readable_boards(user[0]))}", {}
+
+    def board_detail(user):
+        board_id = rng.choice(data.readable_boards(user[0]))
+        return "GET", f"/boards/detail/{board_id}", {"params": {"posts": 10}}
+
+    def list_posts(user):
+        board_id = rng.choice(data.readable_boards(user[0]))
+        return "GET", "/posts/list", {"params": {"board_id": board_id, "size": 20}}
+
+    def get_post(user):
+        posts = data.posts_by_author[user[0]]
+        if not posts:
+            return None
+        return "GET", f"/posts/get/{rng.choice(posts)}", {}
+
+    def search_posts(user):
+        if not searchable:
+            return None
+        return "GET", "/posts/search", {"params": {"q": "lorem", "size": 20}}
+
+    def create_post(user):
+        board_id = rng.choice(data.readable_boards(user[0]))
+        params = {"board_id": board_id, "title": "bench", "content": "bench post"}
+        return "POST", "/posts/create", {"params": params}
+
+    def update_post(user):
+        posts = data.posts_by_author[user[0]]
+        if not posts:
+            return None
+        params = {"post_id": rng.choice(posts), "title": "edited", "content": "edit"}
+        return "PUT", "/posts/update", {"params": params}
+
+    def create_board(user):
+        name = f"bench-new-{uuid.uuid4().hex}"
+        return "POST", "/boards/create", {"json": {"name": name, "is_public": True}}
+
+    def login(user):
+        return (
+            "POST",
+            "/users/login",
+            {"json": {"email": user[1], "password": PASSWORD}},
+        )
+
+    return [
+        ("GET /boards/list", 20, list_boards),
+        ("GET /boards/get/{board_id}", 15, get_board),
+        ("GET /boards/detail/{board_id}", 5, board_detail),
+        ("GET /posts/list", 20, list_posts),
+        ("GET /posts/get/{post_id}", 20, get_post),
+        ("GET /posts/search", 5, search_posts),
+        ("POST /posts/create", 8, create_post),
+        ("PUT /posts/update", 4, update_post),
+        ("POST /boards/create", 1, create_board),
+        ("POST /users/login", 1, login),
+    ]
+
+
+async def drive(client, data, args, count, results):
+    rng = random.Random(args.seed + 1)
+    mix = scenarios(data, rng, searchable=engine.dialect.name == "postgresql")
+    names = [name for name, _, _ in mix]
+    weights = [weight for _, weight, _ in mix]
+    factories = {name: factory for name, _, factory in mix}
+    remaining = count
+
+    async def client_loop():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            user = rng.choice(data.users)
+            name = rng.choices(names, weights)[0]
+            request = factories[name](user)
+            if request is None:
+                remaining += 1
+                continue
+            method, url, options = request
+            headers = {"Authorization": f"Bearer {user[2]}"}
+            started = time.perf_counter()
+            response = await client.request(method, url, headers=headers, **options)
+            elapsed = time.perf_counter() - started
+            if results is not None:
+                results[name].append((elapsed, response.status_code))
+
+    await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+
+
+def summarize(results, wall_seconds):
+    endpoints = {}
+    for name, samples in sorted(results.items()):
+        latencies = [elapsed for elapsed, _ in samples]
+        endpoints[name] = {
+            "requests": len(samples),
+            "errors": sum(1 for _, code in samples if code >= 400),
+            "throughput_rps": len(samples) / wall_seconds,
+            "mean_ms": sum(latencies) / len(latencies) * 1000,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+    return endpoints
+
+
+def regressions(endpoints, baseline, max_regression):
+    found = []
+    for name, stats in endpoints.items():
+        before = baseline["endpoints"].get(name)
+        if before and stats["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            found.append((name, before["p95_ms"], stats["p95_ms"]))
+    return found
+
+
+async def main_async(args):
+    RedisManager._connection = InstrumentedRedis(
+        connection_pool=fakeredis.FakeAsyncRedis(decode_responses=True).connection_pool
+    )
+    UserService.revocations.start()
+    data = Dataset()
+    started = time.perf_counter()
+    await seed(args, data)
+    print(
+        f"seeded {args.users} users, {args.boards} boards, {args.posts} posts "
+        f"in {time.perf_counter() - started:.1f}s on {engine.dialect.name}"
+    )
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await drive(client, data, args, args.warmup, None)
+
+        results = defaultdict(list)
+        started = time.perf_counter()
+        await drive(client, data, args, args.requests, results)
+        wall_seconds = time.perf_counter() - started
+
+    await UserService.revocations.stop()
+    await engine.dispose()
+    UserService.password_hasher.shutdown()
+
+    endpoints = summarize(results, wall_seconds)
+    print(
+        f"\n{'endpoint':<32}{'reqs':>7}{'err':>5}{'rps':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    for name, stats in endpoints.items():
+        print(
+            f"{name:<32}{stats['requests']:>7}{stats['errors']:>5}"
+            f"{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>9.2f}"
+            f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+        )
+    total = sum(stats["requests"] for stats in endpoints.values())
+    print(
+        f"\ntotal {total} requests in {wall_seconds:.2f}s = {total / wall_seconds:.1f} rps"
+    )
+
+    report = {
+        "revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "args": vars(args),
+        "wall_seconds": wall_seconds,
+        "throughput_rps": total / wall_seconds,
+        "endpoints": endpoints,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(endpoints, baseline, args.max_regression)
+        for name, before, after in found:
+            print(f"REGRESSION {name}: p95 {before:.2f}ms -> {after:.2f}ms")
+        if found:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--boards", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--public-ratio", type=float, default=0.8)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_api.json")
+    parser.add_argument("--baseline", help="earlier --output to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
@@ -0,0 +1,217 @@
+"""Post list latency on a plain vs a monthly-partitioned posts table.
+
+Seeds `--rows` posts (50M by default) spread evenly over `--months` months
+into two scratch schemas holding a `posts` table each: `<schema>_plain`, laid
+out like the table before migration a3f6c9e1d7b4, and `<schema>_partitioned`,
+laid out like after it. Then it times, on both, the statements PostService
+actually sends (search_path points `posts` at each schema):
+
+  first page   PostService.list_statement for a board, no cursor
+  deep page    the same with a keyset cursor halfway through the history,
+               where pruning skips the newer half of the partitions
+  by id        a post by post_id, which cannot be pruned (the cost side)
+
+Needs Postgres at DB_URL. Seeding 50M rows takes a long time and roughly
+30 GB for both copies; pass --reuse to time the tables of an earlier run
+again, and --drop to remove them afterwards.
+
+    DB_URL=postgresql+asyncpg://... python benchmarks/bench_partitions.py
+    python benchmarks/bench_partitions.py --rows 1000000 --runs 200 --explain
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from sqlalchemy import select, text
+
+from database import engine
+from models import Post
+from services.posts import PostService
+from utils.pagination import encode_cursor
+
+COLUMNS = """
+    post_id integer NOT NULL,
+    title varchar NOT NULL,
+    content varchar,
+    created_at timestamp without time zone NOT NULL,
+    is_deleted boolean,
+    author_id integer,
+    board_id integer,
+    version integer NOT NULL DEFAULT 1
+"""
+
+SEED = """
+INSERT INTO {schema}.posts
+SELECT g, 'post ' || g, repeat('lorem ipsum ', 8),
+       CAST(:start AS timestamp) + make_interval(secs => (g - 1) * CAST(:step AS float8)),
+       g % 50 = 0, g % 1000, g % :boards, 1
+FROM generate_series(CAST(:low AS integer), CAST(:high AS integer)) AS g
+"""
+
+SEED_CHUNK = 1_000_000
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def month_starts(first: datetime, last: datetime):
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= last:
+        following = (month + timedelta(days=32)).replace(day=1)
+        yield month, following
+        month = following
+
+
+async def seed(args, plain: str, partitioned: str, start: datetime, end: datetime):
+    step = (end - start).total_seconds() / args.rows
+    async with engine.begin() as conn:
+        for schema in (plain, partitioned):
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.execute(text(f"CREATE TABLE {plain}.posts ({COLUMNS})"))
+        await conn.execute(
+            text(
+                f"CREATE TABLE {partitioned}.posts ({COLUMNS}) "
+                "PARTITION BY RANGE (created_at)"
+            )
+        )
+        for month, following in month_starts(start, end):
+            await conn.execute(
+                text(
+                    f"CREATE TABLE {partitioned}.posts_p{month:%Y_%m} "
+                    f"PARTITION OF {partitioned}.posts "
+                    f"FOR VALUES FROM ('{month}') TO ('{following}')"
+                )
+            )
+
+    for low in range(1, args.rows + 1, SEED_CHUNK):
+        high = min(low + SEED_CHUNK - 1, args.rows)
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(SEED.format(schema=plain)),
+                {
+                    "start": start,
+                    "step": step,
+                    "boards": args.boards,
+                    "low": low,
+                    "high": high,
+                },
+            )
+        print(f"  seeded {high:,} / {args.rows:,} rows", flush=True)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(f"INSERT INTO {partitioned}.posts SELECT * FROM {plain}.posts")
+        )
+        # the indexes of models.Post; the partitioned primary key has to
+        # include the partition key
+        for schema, primary_key in (
+            (plain, "post_id"),
+            (partitioned, "post_id, created_at"),
+        ):
+            await conn.execute(
+                text(f"ALTER TABLE {schema}.posts ADD PRIMARY KEY ({primary_key})")
+            )
+            await conn.execute(
+                text(
+                    f"CREATE INDEX ON {schema}.posts (board_id, created_at, post_id) "
+                    "WHERE is_deleted = false"
+                )
+            )
+            await conn.execute(text(f"ANALYZE {schema}.posts"))
+
+
+async def time_statement(schema: str, statements, explain: bool):
+    async with engine.connect() as conn:
+        # resolves `posts` to the schema's table until the transaction ends
+        await conn.execute(text(f"SET LOCAL search_path TO {schema}, public"))
+        if explain:
+            compiled = statements[0].compile(
+                dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+            )
+            plan = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}")
+            print("\n".join(f"      {row[0]}" for row in plan))
+
+        for statement in statements[:10]:  # warm up
+            await conn.execute(statement)
+        samples = []
+        for statement in statements:
+            started = time.perf_counter()
+            (await conn.execute(statement)).fetchall()
+            samples.append(time.perf_counter() - started)
+    return percentile(samples, 50), percentile(samples, 95)
+
+
+async def main(args):
+    if engine.dialect.name != "postgresql":
+        sys.exit("bench_partitions needs Postgres, set DB_URL")
+
+    plain, partitioned = f"{args.schema}_plain", f"{args.schema}_partitioned"
+    end = datetime(2026, 1, 1)
+    start = end - timedelta(days=30 * args.months)
+    if not args.reuse:
+        print(f"seeding {args.rows:,} posts over {args.months} months")
+        await seed(args, plain, partitioned, start, end)
+
+    rng = random.Random(42)
+    middle = start + (end - start) / 2
+    middle_id = args.rows // 2
+    cases = {
+        "first page": [
+            PostService.list_statement(rng.randrange(args.boards), 10)
+            for _ in range(args.runs)
+        ],
+        "deep page": [
+            PostService.list_statement(
+                rng.randrange(args.boards), 10, cursor=encode_cursor(middle, middle_id)
+            )
+            for _ in range(args.runs)
+        ],
+        "by id": [
+            select(Post).where(Post.post_id == rng.randrange(1, args.rows + 1))
+            for _ in range(args.runs)
+        ],
+    }
+
+    print(f"{'query':<12}{'layout':<13}{'p50 ms':>9}{'p95 ms':>9}")
+    for label, statements in cases.items():
+        results = {}
+        for layout, schema in (("plain", plain), ("partitioned", partitioned)):
+            if args.explain:
+                print(f"  {label} / {layout}:")
+            results[layout] = await time_statement(schema, statements, args.explain)
+            p50, p95 = results[layout]
+            print(f"{label:<12}{layout:<13}{p50 * 1000:>9.3f}{p95 * 1000:>9.3f}")
+        print(
+            f"{'':<12}{'speedup':<13}"
+            f"{results['plain'][0] / results['partitioned'][0]:>8.2f}x"
+            f"{results['plain'][1] / results['partitioned'][1]:>8.2f}x"
+        )
+
+    if args.drop:
+        async with engine.begin() as conn:
+            for schema in (plain, partitioned):
+                await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--boards", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--schema", default="bench_partitions")
+    parser.add_argument("--reuse", action="store_true")
+    parser.add_argument("--drop", action="store_true")
+    parser.add_argument("--explain", action="store_true")
+    asyncio.run(main(parser.parse_args()))
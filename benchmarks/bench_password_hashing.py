@@ -0,0 +1,94 @@
+"""Read latency on the event loop while logins hash passwords concurrently.
+
+A "read" is a tiny coroutine standing in for a cached GET handler: its
+latency is the time from its arrival until the loop gets to run it, which is
+what a read endpoint on the same uvicorn worker experiences. Logins run bcrypt
+either inline on the loop (the old behaviour) or through PasswordHasher.
+
+    python benchmarks/bench_password_hashing.py --logins 64 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from passlib.context import CryptContext
+
+from utils.passwords import PasswordHasher
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def read_probe(latencies, stop, interval):
+    while not stop.is_set():
+        # the read "arrives" after `interval` and is answered once the loop
+        # gets to it
+        arrival = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        latencies.append(time.perf_counter() - arrival)
+
+
+async def run(mode, args, context, hashed):
+    hasher = PasswordHasher(
+        context,
+        workers=args.workers,
+        max_pending=args.max_pending,
+        queue_timeout=60,
+    )
+
+    async def login(index):
+        # logins arrive as separate requests, `login_interval` apart
+        await asyncio.sleep(index * args.login_interval)
+        if mode == "inline":
+            context.verify("password", hashed)
+        else:
+            await hasher.verify("password", hashed)
+
+    latencies = []
+    stop = asyncio.Event()
+    probes = [
+        asyncio.create_task(read_probe(latencies, stop, args.interval))
+        for _ in range(args.readers)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*(login(index) for index in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*probes)
+    hasher.shutdown()
+
+    print(
+        f"{mode:>8}: logins={args.logins} in {elapsed:6.2f}s  "
+        f"reads={len(latencies):6d}  "
+        f"read p50={percentile(latencies, 50) * 1000:8.2f}ms  "
+        f"p99={percentile(latencies, 99) * 1000:8.2f}ms  "
+        f"max={max(latencies) * 1000:8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--login-interval", type=float, default=0.02)
+    parser.add_argument("--readers", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.002)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=32)
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    hashed = context.hash("password")
+
+    for mode in ("inline", "executor"):
+        asyncio.run(run(mode, args, context, hashed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Full-text post search latency on a synthetic corpus.
+
+Needs a migrated Postgres database in DB_URL (the ix_posts_search index must
+exist). Seeds `--posts` posts of random words into a dedicated public board
+once, then times PostService.search_statement for a few query shapes.
+
+    python benchmarks/bench_post_search.py --posts 3000000 --runs 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from sqlalchemy import text
+
+from database import engine
+from services.posts import PostService
+from utils.pagination import encode_cursor
+
+BOARD_NAME = "bench-post-search"
+QUERIES = ["alpha", "alpha bravo", '"charlie delta"', "echo -foxtrot", "zulu0042"]
+
+SEED_SQL = """
+WITH words AS (
+    SELECT array_agg(w) AS w FROM (
+        SELECT unnest(ARRAY[
+            'alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf',
+            'hotel', 'india', 'juliet', 'kilo', 'lima', 'mike', 'november',
+            'oscar', 'papa', 'quebec', 'romeo', 'sierra', 'tango'
+        ]) AS w
+        UNION ALL
+        SELECT 'zulu' || lpad(n::text, 4, '0') FROM generate_series(1, 5000) AS n
+    ) AS vocabulary
+)
+INSERT INTO posts (title, content, created_at, is_deleted, author_id, board_id)
+SELECT
+    w[1 + (random() * (array_length(w, 1) - 1))::int] || ' '
+        || w[1 + (random() * (array_length(w, 1) - 1))::int],
+    (
+        SELECT string_agg(w[1 + (random() * (array_length(w, 1) - 1))::int], ' ')
+        FROM generate_series(1, 30 + g % 3)
+    ),
+    now() - (g || ' seconds')::interval,
+    false,
+    :user_id,
+    :board_id
+FROM words, generate_series(1, :count) AS g
+"""
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def seed(conn, count):
+    user_id = await conn.scalar(
+        text(
+            "INSERT INTO users (fullname, email, hash_password, is_logged_in) "
+            "VALUES ('bench', 'bench-search@example.com', '', false) "
+            "RETURNING id"
+        )
+    )
+    board_id = await conn.scalar(
+        text(
+            "INSERT INTO boards (name, is_public, is_deleted, creator_id) "
+            "VALUES (:name, true, false, :user_id) RETURNING board_id"
+        ),
+        {"name": BOARD_NAME, "user_id": user_id},
+    )
+    batch = 250_000
+    for offset in range(0, count, batch):
+        await conn.execute(
+            text(SEED_SQL),
+            {
+                "user_id": user_id,
+                "board_id": board_id,
+                "count": min(batch, count - offset),
+            },
+        )
+        print(f"seeded {min(offset + batch, count)}/{count}", flush=True)
+    await conn.execute(
+        text("UPDATE boards SET post_count = :count WHERE board_id = :board_id"),
+        {"count": count, "board_id": board_id},
+    )
+    return user_id, board_id
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=3_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--size", type=int, default=20)
+    args = parser.parse_args()
+
+    async with engine.begin() as conn:
+        row = (
+            await conn.execute(
+                text("SELECT board_id, creator_id FROM boards WHERE name = :name"),
+                {"name": BOARD_NAME},
+            )
+        ).first()
+        if row is None:
+            user_id, board_id = await seed(conn, args.posts)
+        else:
+            board_id, user_id = row
+
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE posts"))
+        for query in QUERIES:
+            statement = PostService.search_statement(user_id, query, args.size)
+            compiled = statement.compile(
+                dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+            )
+            plan = await conn.execute(text(f"EXPLAIN {compiled}"))
+            uses_index = any("ix_posts_search" in line for (line,) in plan)
+
+            first_page = []
+            next_page = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                rows = (await conn.execute(statement)).fetchall()
+                first_page.append(time.perf_counter() - started)
+
+                if len(rows) == args.size:
+                    # rows are the post columns followed by the rank
+                    cursor = encode_cursor(rows[-1][-1], rows[-1].post_id)
+                    deeper = PostService.search_statement(
+                        user_id, query, args.size, cursor=cursor
+                    )
+                    started = time.perf_counter()
+                    await conn.execute(deeper)
+                    next_page.append(time.perf_counter() - started)
+
+            line = (
+                f"{query!r:>20}: index={'yes' if uses_index else 'NO '} "
+                f"page1 p50={percentile(first_page, 50) * 1000:8.2f}ms "
+                f"p95={percentile(first_page, 95) * 1000:8.2f}ms"
+            )
+            if next_page:
+                line += (
+                    f"  page2 p50={percentile(next_page, 50) * 1000:8.2f}ms "
+                    f"p95={percentile(next_page, 95) * 1000:8.2f}ms"
+                )
+            print(line)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+"""Cost of turning a page of ORM objects into a JSON response body.
+
+Compares, per page of `--items` PostSchema / BoardSchema items:
+
+  fastapi   build schemas by hand (as the services used to), then let
+            FastAPI validate them against response_model and json.dumps
+            the result, which is what returning a list from a route does
+  adapter   one TypeAdapter(List[...]) validation with from_attributes,
+            dumped straight to bytes by pydantic-core
+  orjson    the same validation, dumped to Python and encoded by orjson
+            (only when orjson is installed)
+
+    python benchmarks/bench_serialization.py --items 1000 --runs 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+# models imports the engine; nothing here connects to it
+os.environ.setdefault("DB_URL", "sqlite+aiosqlite://")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from models import Board, Post
+from schemas import BoardListAdapter, BoardSchema, PostListAdapter, PostSchema
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_posts(count):
+    now = datetime.now()
+    return [
+        Post(
+            post_id=i,
+            title=f"post title {i}",
+            content="lorem ipsum dolor sit amet " * 8,
+            created_at=now - timedelta(seconds=i),
+            is_deleted=False,
+            author_id=i % 97,
+            board_id=i % 13,
+        )
+        for i in range(count)
+    ]
+
+
+def make_boards(count):
+    return [
+        Board(
+            board_id=i,
+            name=f"board {i}",
+            is_public=i % 4 != 0,
+            is_deleted=False,
+            creator_id=i % 97,
+            post_count=count - i,
+        )
+        for i in range(count)
+    ]
+
+
+def response_field(schema):
+    route = APIRoute("/bench", lambda: None, response_model=List[schema])
+    return route.secure_cloned_response_field
+
+
+async def fastapi_path(field, build, rows):
+    content = await serialize_response(
+        field=field, response_content=build(rows), is_coroutine=True
+    )
+    return JSONResponse(content).body
+
+
+def build_posts(rows):
+    return [
+        PostSchema(
+            title=post.title,
+            content=post.content,
+            is_deleted=post.is_deleted,
+            post_id=post.post_id,
+            author_id=post.author_id,
+            board_id=post.board_id,
+            created_at=post.created_at,
+        )
+        for post in rows
+    ]
+
+
+def build_boards(rows):
+    return [
+        BoardSchema(
+            name=board.name,
+            is_public=board.is_public,
+            is_deleted=board.is_deleted,
+            board_id=board.board_id,
+            creator_id=board.creator_id,
+        )
+        for board in rows
+    ]
+
+
+async def measure(label, runs, encode):
+    await encode()  # warm up
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        body = await encode()
+        samples.append(time.perf_counter() - started)
+    print(
+        f"  {label:<8} p50 {percentile(samples, 50) * 1000:7.3f}ms  "
+        f"p95 {percentile(samples, 95) * 1000:7.3f}ms  {len(body)} bytes"
+    )
+    return percentile(samples, 50)
+
+
+async def main(args):
+    cases = [
+        ("PostSchema", PostSchema, PostListAdapter, build_posts, make_posts),
+        ("BoardSchema", BoardSchema, BoardListAdapter, build_boards, make_boards),
+    ]
+    for name, schema, adapter, build, make in cases:
+        rows = make(args.items)
+        field = response_field(schema)
+        print(f"{args.items} x {name}")
+
+        async def via_fastapi():
+            return await fastapi_path(field, build, rows)
+
+        async def via_adapter():
+            return adapter.dump_json(
+                adapter.validate_python(rows, from_attributes=True)
+            )
+
+        async def via_orjson():
+            items = adapter.validate_python(rows, from_attributes=True)
+            return orjson.dumps(adapter.dump_python(items))
+
+        baseline = await measure("fastapi", args.runs, via_fastapi)
+        fast = await measure("adapter", args.runs, via_adapter)
+        if orjson is not None:
+            await measure("orjson", args.runs, via_orjson)
+        print(f"  adapter is {baseline / fast:.1f}x faster than fastapi\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
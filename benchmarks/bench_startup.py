@@ -0,0 +1,130 @@
+"""Time from starting a uvicorn worker to its first served request.
+
+For each startup configuration, starts `python -m uvicorn main:app` in a
+subprocess, polls GET / until the worker answers ("ready"), then times the
+first request that needs the database, GET /boards/list. Reports the median
+over `--runs` starts.
+
+Uses DB_URL when set (it must already be at `alembic upgrade head`),
+otherwise a scratch SQLite file that is created and stamped with the
+current head.
+
+    python benchmarks/bench_startup.py --runs 10
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC = os.path.join(ROOT, "src")
+sys.path.append(SRC)
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), "bench_startup.db")
+USE_SCRATCH_DB = not os.getenv("DB_URL")
+if USE_SCRATCH_DB:
+    os.environ["DB_URL"] = f"sqlite+aiosqlite:///{SCRATCH_DB}"
+SECRET = os.getenv("JWT_SECRET_KEY", "bench-secret")
+
+import httpx
+from jose import jwt
+from sqlalchemy import create_engine, text
+
+from models import Base
+from utils.migrations import expected_heads
+
+CONFIGURATIONS = [
+    ("create_all", {"DB_STARTUP_MODE": "create_all", "DB_POOL_PREWARM": "0"}),
+    ("check", {"DB_STARTUP_MODE": "check", "DB_POOL_PREWARM": "0"}),
+    ("check + prewarm", {"DB_STARTUP_MODE": "check", "DB_POOL_PREWARM": "5"}),
+]
+
+
+def prepare_scratch_db():
+    """Create the schema in a fresh SQLite file and stamp it at head."""
+    if os.path.exists(SCRATCH_DB):
+        os.remove(SCRATCH_DB)
+    sync_engine = create_engine(f"sqlite:///{SCRATCH_DB}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(
+            text("CREATE TABLE alembic_version (version_num VARCHAR(32) PRIMARY KEY)")
+        )
+        for head in expected_heads():
+            conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": head})
+    sync_engine.dispose()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_once(env, token):
+    port = free_port()
+    started = time.perf_counter()
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=SRC,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while True:
+                if worker.poll() is not None:
+                    raise RuntimeError("worker exited during startup")
+                try:
+                    if client.get("/").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            ready = time.perf_counter() - started
+
+            first_started = time.perf_counter()
+            response = client.get(
+                "/boards/list", headers={"Authorization": f"Bearer {token}"}
+            )
+            response.raise_for_status()
+            first_request = time.perf_counter() - first_started
+    finally:
+        worker.terminate()
+        worker.wait()
+    return ready, first_request
+
+
+def main(args):
+    if USE_SCRATCH_DB:
+        prepare_scratch_db()
+    token = jwt.encode(
+        {"sub": "1", "exp": datetime.utcnow() + timedelta(hours=1)},
+        SECRET,
+        algorithm="HS256",
+    )
+    base_env = {
+        **os.environ,
+        "JWT_SECRET_KEY": SECRET,
+        "JWT_ALGORITHM": "HS256",
+    }
+
+    print(f"{'startup':<18}{'ready ms':>10}{'first DB req ms':>17}{'total ms':>10}")
+    for label, overrides in CONFIGURATIONS:
+        samples = [
+            start_once({**base_env, **overrides}, token) for _ in range(args.runs)
+        ]
+        ready = statistics.median(sample[0] for sample in samples) * 1000
+        first = statistics.median(sample[1] for sample in samples) * 1000
+        print(f"{label:<18}{ready:>10.1f}{first:>17.1f}{ready + first:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    main(parser.parse_args())
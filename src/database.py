@@ -1,28 +1,219 @@
-from typing import Callable
+from typing import Callable, Dict, List, Optional
+import asyncio
+import itertools
 import os
+import time
+from contextvars import ContextVar
 from dotenv import load_dotenv
 
 dotenv_path = os.path.join(os.path.dirname(__file__), "..", ".env")
 load_dotenv(dotenv_path)
 
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
 )
 
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from utils import metrics, query_counter
+from utils.pool_stats import InstrumentedQueuePool
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DB_URL")
+# comma separated, reads are spread over these when set
+SQLALCHEMY_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()
+]
+# after a write, the same caller reads from the primary for this long
+REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+# a replica that failed is skipped for this long before being retried
+REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
+# per engine; a worker holds at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+# to the primary and to each replica
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# seconds, -1 keeps connections forever
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+# "always": ping on every checkout (one extra round-trip)
+# "never": rely on DB_POOL_RECYCLE and invalidation of connections that fail
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "always")
+# connections opened per engine at startup, capped at DB_POOL_SIZE
+POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", "0"))
+
+# "create_all": create missing tables at startup (development)
+# "check": only verify the database is at the Alembic head, refuse to start
+# otherwise (production, schema managed by `alembic upgrade head`)
+STARTUP_MODE = os.getenv("DB_STARTUP_MODE", "create_all")
+
+
+def create_engine(url: str) -> AsyncEngine:
+    new_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=POOL_PRE_PING == "always",
+    )
+    query_counter.install(new_engine)
+    metrics.install(new_engine)
+    return new_engine
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL)
+replica_engines: List[AsyncEngine] = [
+    create_engine(url) for url in SQLALCHEMY_REPLICA_URLS
+]
+
+
+class ReplicaRouter:
+    """Round-robins reads over the healthy replicas.
+
+    Replicas reported through `mark_unhealthy` are skipped for
+    REPLICA_RETRY_SECONDS; with none left, reads fall back to the primary.
+    Callers that wrote recently stick to the primary for
+    REPLICA_STICKY_SECONDS so they read their own writes.
+    """
+
+    def __init__(self, engines: List[AsyncEngine]):
+        self.engines = engines
+        self._turn = itertools.count()
+        self._unhealthy_until: Dict[AsyncEngine, float] = {}
+        self._last_write: Dict[object, float] = {}
+
+    def pick(self, sticky_key=None) -> Optional[AsyncEngine]:
+        if not self.engines:
+            return None
+
+        now = time.monotonic()
+        if sticky_key is not None:
+            written_at = self._last_write.get(sticky_key)
+            if written_at is not None and now - written_at < REPLICA_STICKY_SECONDS:
+                return None
+
+        for _ in range(len(self.engines)):
+            replica = self.engines[next(self._turn) % len(self.engines)]
+            if self._unhealthy_until.get(replica, 0) <= now:
+                return replica
+        return None
+
+    def mark_unhealthy(self, replica: AsyncEngine):
+        self._unhealthy_until[replica] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+    def record_write(self, sticky_key):
+        if sticky_key is None or not self.engines:
+            return
+        now = time.monotonic()
+        self._last_write[sticky_key] = now
+        if len(self._last_write) > 10000:
+            self._last_write = {
+                key: written_at
+                for key, written_at in self._last_write.items()
+                if now - written_at < REPLICA_STICKY_SECONDS
+            }
+
+
+replicas = ReplicaRouter(replica_engines)
+
+# identifies the caller for read-your-writes stickiness, set per request
+_sticky_key: ContextVar[Optional[object]] = ContextVar("db_sticky_key", default=None)
+
 
+def set_sticky_key(key):
+    _sticky_key.set(key)
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
 
+class RoutingSession(Session):
+    """Sends statements executed with bind_arguments={"replica": True} to a
+    replica, everything else (and anything after a write) to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, replica=False, **kw):
+        if replica and not self.info.get("wrote"):
+            replica_engine = replicas.pick(_sticky_key.get())
+            if replica_engine is not None:
+                self.info["replica"] = replica_engine
+                return replica_engine.sync_engine
+        return engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_orm_writes(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_flush_writes(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _track_committed_writes(session):
+    if session.info.pop("wrote", False):
+        replicas.record_write(_sticky_key.get())
+
+
+# committed objects stay loaded: writes read server values via RETURNING
+# instead of a refresh() round-trip after commit
 session_create: Callable[[], AsyncSession] = async_sessionmaker(
-    autocommit=False, autoflush=False, bind=engine
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    sync_session_class=RoutingSession,
 )
 
 
+async def execute_read(db: AsyncSession, statement):
+    """Execute a read-only statement on a replica when one is available.
+
+    If the replica fails, it is marked unhealthy and the statement is
+    retried on the primary. Replicas lag: rows that go into a cache shared
+    by all callers must be read from the primary instead.
+    """
+    if not replicas.engines:
+        return await db.execute(statement)
+
+    db.info.pop("replica", None)
+    try:
+        return await db.execute(statement, bind_arguments={"replica": True})
+    except DBAPIError:
+        replica_engine = db.info.pop("replica", None)
+        if replica_engine is None:
+            raise
+        replicas.mark_unhealthy(replica_engine)
+        await db.rollback()
+        return await db.execute(statement)
+
+
+async def prewarm_pools(count: int = POOL_PREWARM):
+    """Open up to `count` connections per engine so the first requests after
+    startup don't pay for connection setup."""
+    count = min(count, POOL_SIZE)
+    if count <= 0:
+        return
+
+    for pool_engine in [engine, *replica_engines]:
+        connections = await asyncio.gather(
+            *(pool_engine.connect() for _ in range(count))
+        )
+        for connection in connections:
+            await connection.close()
+
+
+def pool_status() -> dict:
+    return {
+        "primary": engine.pool.snapshot(),
+        "replicas": [replica.pool.snapshot() for replica in replica_engines],
+    }
+
+
 async def get_db() -> AsyncSession:
     db = session_create()
     try:
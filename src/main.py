@@ -1,26 +1,55 @@
-from fastapi import FastAPI
-from routers import users, boards, posts
+from fastapi import Depends, FastAPI, Response
+from routers import users, boards, posts, internal
 from models import init_db
-from database import engine
+from database import STARTUP_MODE, engine, prewarm_pools
+from services.boards import BoardService
+from services.posts import PostService
+from services.users import UserService
+from utils.redis_manager import RedisManager
+from utils import metrics
+from utils.internal_access import internal_only
+from utils.migrations import check_schema_revision
+from utils.partitions import PostPartitions
 
 
 app = FastAPI()
+post_partitions = PostPartitions(engine)
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(users.router)
 app.include_router(boards.router)
 app.include_router(posts.router)
+app.include_router(internal.router)
 
 
 @app.on_event("startup")
 async def startup_event():
-    await init_db(engine)
+    if STARTUP_MODE == "check":
+        await check_schema_revision(engine)
+    else:
+        await init_db(engine)
+    await prewarm_pools()
+    post_partitions.start()
+    UserService.revocations.start()
+    BoardService.leaderboard.start(BoardService.reconcile_leaderboard)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await UserService.revocations.stop()
+    await BoardService.leaderboard.stop()
+    await PostService.cascade_jobs.stop()
+    await post_partitions.stop()
     await engine.dispose()
+    await RedisManager.close()
+    UserService.password_hasher.shutdown()
 
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(internal_only)])
+def read_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
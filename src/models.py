@@ -1,4 +1,8 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Index
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects import postgresql  # registers to_tsvector() & co.
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from datetime import datetime
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
@@ -8,12 +12,29 @@ from database import engine
 
 Base = declarative_base()
 
+# text search configuration of the posts full-text index
+POST_SEARCH_CONFIG = "simple"
+
+
+def post_search_document(title, content):
+    """tsvector over a post's title and content.
+
+    Constants are rendered inline so queries repeat the exact expression of the
+    ix_posts_search GIN index and the planner can match it.
+    """
+    return func.to_tsvector(
+        literal_column(f"'{POST_SEARCH_CONFIG}'::regconfig"),
+        func.coalesce(title, literal_column("''"))
+        .op("||")(literal_column("' '"))
+        .op("||")(func.coalesce(content, literal_column("''"))),
+    )
+
 
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     fullname = Column(String, index=True, nullable=False)
-    email = Column(String, nullable=False)
+    email = Column(String, nullable=False, unique=True, index=True)
     hash_password = Column(String)
     is_logged_in = Column(Boolean, default=False)
     boards = relationship("Board", back_populates="creator")
@@ -32,9 +53,45 @@ class Board(Base):
     creator = relationship("User", back_populates="boards")
     # board - post
     posts = relationship("Post", back_populates="board")
+    # maintained by PostService.create_post / delete_post
+    post_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # bumped by every update and soft delete, the ETag of /boards/get
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        # /boards/list ranking by post count
+        Index("ix_boards_post_count_board_id", post_count, board_id),
+        # the two halves of the "creator_id = :me OR is_public" predicate
+        Index(
+            "ix_boards_creator_id_post_count_live",
+            creator_id,
+            post_count,
+            board_id,
+            postgresql_where=is_deleted == False,
+        ),
+        Index(
+            "ix_boards_post_count_public_live",
+            post_count,
+            board_id,
+            postgresql_where=(is_public == True) & (is_deleted == False),
+        ),
+    )
 
 
 class Post(Base):
+    # On Postgres the table is range-partitioned by month on created_at
+    # (migration a3f6c9e1d7b4), so its primary key has to be
+    # (post_id, created_at); create_all still builds a plain table.
+    #
+    # The mapping keeps post_id as the only primary key. Every route, cache
+    # key and batch lookup identifies a post by its id alone, and one
+    # sequence feeds all partitions so ids stay unique in practice, although
+    # the database no longer enforces it. The price: a lookup by post_id alone
+    # (a cache miss in get_post_from_id, /posts/batch) probes the post_id
+    # index of every partition. Queries that know the post's created_at
+    # (keyset cursors, updates and deletes of a loaded post, the board
+    # delete cascade) filter on it too so the planner prunes to one
+    # partition.
     __tablename__ = "posts"
     post_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String, index=True, nullable=False)
@@ -47,6 +104,44 @@ class Post(Base):
     # board - post
     board_id = Column(Integer, ForeignKey("boards.board_id"))
     board = relationship("Board", back_populates="posts")
+    # bumped by every update and soft delete, the ETag of /posts/get
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        # keyset pagination of a board's live posts, newest first
+        Index(
+            "ix_posts_board_id_created_at_post_id_live",
+            board_id,
+            created_at,
+            post_id,
+            postgresql_where=is_deleted == False,
+        ),
+        # full-text search, see PostService.search_posts
+        Index(
+            "ix_posts_search",
+            post_search_document(title, content),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class truncate_to_hour(FunctionElement):
+    """A timestamp rounded down to the hour: date_trunc() on Postgres,
+    strftime() on SQLite, which has no date_trunc()."""
+
+    type = DateTime()
+    name = "truncate_to_hour"
+    inherit_cache = True
+
+
+@compiles(truncate_to_hour)
+def _truncate_to_hour(element, compiler, **kw):
+    return f"date_trunc('hour', {compiler.process(element.clauses, **kw)})"
+
+
+@compiles(truncate_to_hour, "sqlite")
+def _truncate_to_hour_sqlite(element, compiler, **kw):
+    return f"strftime('%Y-%m-%d %H:00:00', {compiler.process(element.clauses, **kw)})"
 
 
 async def init_db(engine):
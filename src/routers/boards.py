@@ -1,11 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from services.users import UserService
 from services.boards import BoardService
+from services.posts import PostService
+from utils.batch import batch_ids
+from utils.rate_limit import UserRateLimit
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.etag import entity_etag, etag_matches, not_modified
+from utils.serialization import json_response, model_response
 
-from schemas import BoardBaseSchema, BoardSchema
-from typing import List
+from schemas import (
+    BoardBaseSchema,
+    BoardBatchAdapter,
+    BoardBatchItemSchema,
+    BoardCascadeJobSchema,
+    BoardListAdapter,
+    BoardSchema,
+    Principal,
+)
+from typing import List, Optional
 
 router = APIRouter(
     prefix="/boards",
@@ -13,13 +28,18 @@ router = APIRouter(
 )
 
 
-@router.post("/create", response_model=BoardSchema)
+create_rate_limit = UserRateLimit("boards_create", "10/60")
+
+
+@router.post(
+    "/create", response_model=BoardSchema, dependencies=[Depends(create_rate_limit)]
+)
 async def create_board(
     board: BoardBaseSchema,
     db: AsyncSession = Depends(get_db),
-    token: str = Depends(UserService.oauth2_scheme),
+    principal: Principal = Depends(UserService.get_principal),
 ):
-    return await BoardService.create_board(db, board.name, board.is_public, token)
+    return await BoardService.create_board(db, board.name, board.is_public, principal)
 
 
 @router.put("/update", response_model=BoardSchema)
@@ -27,45 +47,104 @@ async def update_board(
     board_id: int,
     name: str,
     public: bool,
-    token: str = Depends(UserService.oauth2_scheme),
+    principal: Principal = Depends(UserService.get_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    return await BoardService.update_board(db, board_id, name, public, token)
+    return await BoardService.update_board(db, board_id, name, public, principal)
 
 
 @router.delete("/delete/{board_id}", response_model=dict)
 async def delete_board(
     board_id: int,
-    token: str = Depends(UserService.oauth2_scheme),
+    principal: Principal = Depends(UserService.get_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    return await BoardService.delete_board(db, board_id, token)
+    result = await BoardService.delete_board(db, board_id, principal)
+    await PostService.start_board_cascade(board_id, principal)
+    return {**result, "job": f"/boards/delete/{board_id}/status"}
+
+
+@router.get("/delete/{board_id}/status", response_model=BoardCascadeJobSchema)
+async def get_board_delete_status(
+    board_id: int,
+    principal: Principal = Depends(UserService.get_principal),
+):
+    return await PostService.get_board_cascade(board_id, principal)
 
 
 @router.get("/get/{board_id}", response_model=BoardSchema)
 async def get_board(
     board_id: int,
-    token: str = Depends(UserService.oauth2_scheme),
+    if_none_match: Optional[str] = Header(None),
+    principal: Principal = Depends(UserService.get_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    board = await BoardService.get_board_from_id(db, board_id, token)
+    if if_none_match:
+        # answered from the cached version stamp, no row fetch or serialization
+        version = await BoardService.get_board_version(board_id, principal)
+        if version is not None:
+            etag = entity_etag("board", board_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    board = await BoardService.get_board_from_id(db, board_id, principal)
+    etag = entity_etag("board", board_id, board.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return model_response(board, headers={"ETag": etag})
 
-    return BoardSchema(
-        name=board.name,
-        is_public=board.is_public,
-        board_id=board.board_id,
-        creator_id=board.creator_id,
+
+@router.get("/batch", response_model=List[BoardBatchItemSchema])
+async def get_boards_from_ids(
+    ids: List[int] = Depends(batch_ids),
+    principal: Principal = Depends(UserService.get_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    items = await BoardService.get_boards_from_ids(db, ids, principal)
+    return json_response(BoardBatchAdapter, items)
+
+
+@router.get("/detail/{board_id}", response_model=BoardSchema)
+async def get_board_detail(
+    board_id: int,
+    posts: int = Query(10, ge=0),
+    principal: Principal = Depends(UserService.get_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    board = await BoardService.get_board_detail(db, board_id, principal, posts)
+    return model_response(board)
+
+
+@router.get("/{board_id}/export")
+async def export_board_posts(
+    board_id: int,
+    principal: Principal = Depends(UserService.get_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    stream = await BoardService.export_posts(db, board_id, principal)
+    return StreamingResponse(
+        stream,
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="board-{board_id}.ndjson"'
+        },
     )
 
 
-# /list?page=1
+# /list?cursor=... walks the leaderboard, /list?page=N the database ranking
 
 
 @router.get("/list", response_model=List[BoardSchema])
 async def get_all_accessible_boards(
-    page: int = 1,
-    size: int = 10,
+    page: Optional[int] = Query(None, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    window: Optional[str] = Query(None, description="24h or 7d: hot boards"),
     db: AsyncSession = Depends(get_db),
-    token: str = Depends(UserService.oauth2_scheme),
+    principal: Principal = Depends(UserService.get_principal),
 ):
-    return await BoardService.get_all_accessible_boards(db, token, page, size)
+    boards, next_cursor = await BoardService.get_all_accessible_boards(
+        db, principal, page, size, cursor, window
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(BoardListAdapter, boards, headers)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+
+from database import pool_status
+from services.boards import BoardService
+from services.posts import PostService
+from utils.internal_access import internal_only
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(internal_only)],
+)
+
+
+@router.get("/cache", response_model=dict)
+async def get_cache_stats():
+    return {
+        "board": BoardService.cache.stats(),
+        "post": PostService.cache.stats(),
+    }
+
+
+@router.get("/pool", response_model=dict)
+async def get_pool_stats():
+    return pool_status()
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
 from database import get_db
-from schemas import PostSchema
-from typing import List
+from schemas import (
+    PostBatchAdapter,
+    PostBatchItemSchema,
+    PostBulkResultSchema,
+    PostCreateSchema,
+    PostListAdapter,
+    PostSchema,
+    Principal,
+)
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from services.users import UserService
 from services.posts import PostService
+from utils.batch import batch_ids
+from utils.rate_limit import UserRateLimit
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.etag import entity_etag, etag_matches, not_modified
+from utils.serialization import json_response, model_response
 
 
 router = APIRouter(
@@ -14,15 +27,36 @@ router = APIRouter(
 )
 
 
-@router.post("/create", response_model=PostSchema)
+create_rate_limit = UserRateLimit("posts_create", "30/60")
+# one request carries up to PostService.BULK_MAX_POSTS posts
+bulk_rate_limit = UserRateLimit("posts_bulk", "5/60")
+
+
+@router.post(
+    "/create", response_model=PostSchema, dependencies=[Depends(create_rate_limit)]
+)
 async def create_post(
     board_id: int,
     title: str,
     content: str,
     db: AsyncSession = Depends(get_db),
-    token: str = Depends(UserService.oauth2_scheme),
+    principal: Principal = Depends(UserService.get_principal),
+):
+    return await PostService.create_post(db, board_id, title, content, principal)
+
+
+@router.post(
+    "/bulk",
+    response_model=PostBulkResultSchema,
+    dependencies=[Depends(bulk_rate_limit)],
+)
+async def bulk_create_posts(
+    board_id: int,
+    posts: List[PostCreateSchema],
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(UserService.get_principal),
 ):
-    return await PostService.create_post(db, board_id, title, content, token)
+    return await PostService.bulk_create_posts(db, board_id, posts, principal)
 
 
 @router.put("/update", response_model=PostSchema)
@@ -31,35 +65,79 @@ async def update_post(
     title: str,
     content: str,
     db: AsyncSession = Depends(get_db),
-    token: str = Depends(UserService.oauth2_scheme),
+    principal: Principal = Depends(UserService.get_principal),
 ):
-    return await PostService.update_post(db, post_id, title, content, token)
+    return await PostService.update_post(db, post_id, title, content, principal)
 
 
 @router.delete("/delete/{post_id}", response_model=dict)
 async def delete_post(
     post_id: int,
-    token: str = Depends(UserService.oauth2_scheme),
+    principal: Principal = Depends(UserService.get_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    return await PostService.delete_post(db, post_id, token)
+    return await PostService.delete_post(db, post_id, principal)
 
 
 @router.get("/get/{post_id}", response_model=PostSchema)
 async def get_post_from_id(
     post_id: int,
-    token: str = Depends(UserService.oauth2_scheme),
+    if_none_match: Optional[str] = Header(None),
+    principal: Principal = Depends(UserService.get_principal),
     db: AsyncSession = Depends(get_db),
 ):
-    return await PostService.get_post_from_id(db, post_id, token)
+    if if_none_match:
+        # answered from the cached version stamp, no row fetch or serialization
+        version = await PostService.get_post_version(post_id, principal)
+        if version is not None:
+            etag = entity_etag("post", post_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    post = await PostService.get_post_from_id(db, post_id, principal)
+    etag = entity_etag("post", post_id, post.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return model_response(post, headers={"ETag": etag})
+
+
+@router.get("/batch", response_model=List[PostBatchItemSchema])
+async def get_posts_from_ids(
+    ids: List[int] = Depends(batch_ids),
+    principal: Principal = Depends(UserService.get_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    items = await PostService.get_posts_from_ids(db, ids, principal)
+    return json_response(PostBatchAdapter, items)
 
 
 @router.get("/list", response_model=List[PostSchema])
 async def get_all_accessible_posts(
     board_id: int,
-    page: int = 1,
-    size: int = 10,
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(UserService.get_principal),
+):
+    posts, next_cursor = await PostService.get_all_accessible_posts(
+        db, board_id, principal, page, size, cursor
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(PostListAdapter, posts, headers)
+
+
+@router.get("/search", response_model=List[PostSchema])
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    board_id: Optional[int] = None,
+    size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    token: str = Depends(UserService.oauth2_scheme),
+    principal: Principal = Depends(UserService.get_principal),
 ):
-    return await PostService.get_all_accessible_posts(db, board_id, token, page, size)
+    posts, next_cursor = await PostService.search_posts(
+        db, q, principal, size, board_id, cursor
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(PostListAdapter, posts, headers)
@@ -2,12 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from services.users import UserService
+from utils.rate_limit import ClientRateLimit
 
 from datetime import timedelta
 
 from fastapi.security import OAuth2PasswordRequestForm
 
-from schemas import Token, UserBaseSchema, UserCreateSchema, UserLoginSchema
+from schemas import (
+    Principal,
+    Token,
+    UserBaseSchema,
+    UserCreateSchema,
+    UserLoginSchema,
+)
 
 router = APIRouter(
     prefix="/users",
@@ -20,7 +27,10 @@ async def create_user(user: UserCreateSchema, db: AsyncSession = Depends(get_db)
     return await UserService.create_user(db=db, user=user)
 
 
-@router.post("/login", response_model=Token)
+login_rate_limit = ClientRateLimit("users_login", "10/60")
+
+
+@router.post("/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
 async def login_user(
     form_data: UserLoginSchema,
     db: AsyncSession = Depends(get_db),
@@ -30,12 +40,13 @@ async def login_user(
 
 @router.post("/logout")
 async def logout_user(
-    token: str = Depends(UserService.oauth2_scheme), db: AsyncSession = Depends(get_db)
+    principal: Principal = Depends(UserService.get_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    return await UserService.logout_user(db, token)
+    return await UserService.logout_user(db, principal)
 
 
-@router.post("/token")
+@router.post("/token", dependencies=[Depends(login_rate_limit)])
 async def login_for_access_token(
     db: AsyncSession = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
+from typing import Literal, Optional, List
 from models import Post
 import datetime
 
@@ -36,6 +36,19 @@ class Token(BaseModel):
     token_type: str
 
 
+class Principal(BaseModel):
+    """Caller identity, verified once per request from the bearer token."""
+
+    user_id: int
+    expires_at: Optional[int] = None
+    token_digest: str
+    # the token's jti, None for tokens issued before sessions were tracked
+    session_id: Optional[str] = None
+
+    class Config:
+        frozen = True
+
+
 # Post Schema
 class PostBaseSchema(BaseModel):
     title: str
@@ -52,11 +65,34 @@ class PostSchema(PostBaseSchema):
     author_id: int
     board_id: int
     created_at: Optional[datetime.datetime]
+    version: int = 1
 
     class Config:
         orm_mode = True
 
 
+class PostBulkErrorSchema(BaseModel):
+    index: int
+    detail: str
+
+
+class PostBulkResultSchema(BaseModel):
+    board_id: int
+    # aligned with the request items, None where the item failed
+    post_ids: List[Optional[int]]
+    errors: List[PostBulkErrorSchema] = []
+
+
+# per-id outcome of the /batch endpoints
+BatchStatus = Literal["ok", "not_found", "forbidden"]
+
+
+class PostBatchItemSchema(BaseModel):
+    post_id: int
+    status: BatchStatus
+    post: Optional[PostSchema] = None
+
+
 # Board Schema
 class BoardBaseSchema(BaseModel):
     name: str
@@ -71,7 +107,33 @@ class BoardSchema(BoardBaseSchema):
     is_deleted: Optional[bool] = False
     board_id: int
     creator_id: int
+    version: int = 1
     posts: Optional[List[PostSchema]] = []
 
     class Config:
         orm_mode = True
+
+
+class BoardBatchItemSchema(BaseModel):
+    board_id: int
+    status: BatchStatus
+    board: Optional[BoardSchema] = None
+
+
+class BoardCascadeJobSchema(BaseModel):
+    """Progress of soft deleting a deleted board's posts."""
+
+    board_id: int
+    state: Literal["pending", "running", "done", "failed"]
+    posts_deleted: int = 0
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+    error: Optional[str] = None
+
+
+# list responses are validated and dumped to JSON in one pass, see
+# utils.serialization
+PostListAdapter = TypeAdapter(List[PostSchema])
+BoardListAdapter = TypeAdapter(List[BoardSchema])
+PostBatchAdapter = TypeAdapter(List[PostBatchItemSchema])
+BoardBatchAdapter = TypeAdapter(List[BoardBatchItemSchema])
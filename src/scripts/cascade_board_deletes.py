@@ -0,0 +1,42 @@
+"""Soft delete the remaining live posts of every deleted board.
+
+Board deletes already do this in the background of the API worker; run it
+for boards deleted before the cascade existed, or whose job was cut short
+by a restart.
+
+Run from src/:  python -m scripts.cascade_board_deletes
+"""
+import asyncio
+
+from sqlalchemy import select
+
+from database import engine, session_create
+from models import Board, Post
+from services.posts import PostService
+from utils.redis_manager import RedisManager
+
+
+async def main():
+    statement = (
+        select(Board.board_id)
+        .where(Board.is_deleted == True)
+        .where(
+            select(Post.post_id)
+            .where(Post.board_id == Board.board_id)
+            .where(Post.is_deleted == False)
+            .exists()
+        )
+    )
+    async with session_create() as db:
+        board_ids = (await db.execute(statement)).scalars().all()
+
+    for board_id in board_ids:
+        deleted = await PostService.cascade_board_delete(board_id)
+        print(f"board {board_id}: {deleted} post(s) deleted")
+
+    await engine.dispose()
+    await RedisManager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
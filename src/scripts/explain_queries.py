@@ -0,0 +1,188 @@
+"""Print the query plan of every read query the services issue.
+
+Calls the read paths of UserService, BoardService and PostService against
+the database in DB_URL, records the SQL they emit and EXPLAINs each
+statement with its real parameters. Diff the output between commits to spot
+plan regressions; --fail-on-seq-scan exits non-zero when a plan falls back to
+a sequential scan of users, boards or posts.
+
+Run from src/:
+    python -m scripts.explain_queries --seed          # seed once
+    python -m scripts.explain_queries --fail-on-seq-scan
+"""
+import argparse
+import asyncio
+import re
+import sys
+
+from sqlalchemy import event, text
+
+from database import engine, session_create
+from schemas import Principal
+from services.boards import BoardService
+from services.posts import PostService
+from services.users import UserService
+
+SEED_EMAIL = "explain-0@example.com"
+
+SEED_SQL = [
+    """
+    INSERT INTO users (fullname, email, hash_password, is_logged_in)
+    SELECT 'explain ' || g, 'explain-' || g || '@example.com', '', false
+    FROM generate_series(0, :users - 1) AS g
+    """,
+    """
+    INSERT INTO boards (name, is_public, is_deleted, creator_id, post_count)
+    SELECT 'explain-' || g, g % 4 <> 0, g % 50 = 0,
+           (SELECT min(id) FROM users WHERE email LIKE 'explain-%') + g % :users, 0
+    FROM generate_series(0, :boards - 1) AS g
+    """,
+    """
+    INSERT INTO posts (title, content, created_at, is_deleted, author_id, board_id)
+    SELECT 'post ' || g, 'content of post ' || g, now() - (g || ' minutes')::interval,
+           g % 20 = 0, b.creator_id, b.board_id
+    FROM generate_series(0, :posts - 1) AS g
+    JOIN boards AS b ON b.name = 'explain-' || (g % :boards)
+    """,
+    """
+    UPDATE boards SET post_count = (
+        SELECT count(*) FROM posts
+        WHERE posts.board_id = boards.board_id AND posts.is_deleted = false
+    )
+    WHERE name LIKE 'explain-%'
+    """,
+    "ANALYZE users",
+    "ANALYZE boards",
+    "ANALYZE posts",
+]
+
+# posts_pYYYY_MM are the monthly partitions of posts
+SEQ_SCAN = re.compile(
+    r"Seq Scan on (users|boards|posts(_p\d{4}_\d{2})?)\b"
+    r"|SCAN (users|boards|posts)\b(?! USING)"
+)
+
+
+async def seed(users: int, boards: int, posts: int):
+    params = {"users": users, "boards": boards, "posts": posts}
+    async with engine.begin() as conn:
+        for statement in SEED_SQL:
+            await conn.execute(text(statement), params)
+
+
+async def capture_queries():
+    """Run each read path once and return [(label, sql, parameters)]."""
+    captured = []
+    label = None
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if label is not None:
+            captured.append((label, statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        async with session_create() as db:
+            user = await UserService.get_user_from_email(db, SEED_EMAIL)
+            if user is None:
+                sys.exit("database is not seeded, run with --seed first")
+            principal = Principal(user_id=user.id, token_digest="explain")
+            board_id = (
+                await db.execute(
+                    text(
+                        "SELECT board_id FROM boards WHERE creator_id = :user_id "
+                        "AND is_deleted = false ORDER BY post_count DESC LIMIT 1"
+                    ),
+                    {"user_id": user.id},
+                )
+            ).scalar_one()
+            post_id = (
+                await db.execute(
+                    text(
+                        "SELECT post_id FROM posts WHERE board_id = :board_id "
+                        "AND is_deleted = false LIMIT 1"
+                    ),
+                    {"board_id": board_id},
+                )
+            ).scalar_one()
+
+            # the read-through caches would hide the database lookups
+            await BoardService.cache.invalidate(board_id)
+            await PostService.cache.invalidate(post_id)
+
+            label = "UserService.get_user_from_email"
+            await UserService.get_user_from_email(db, SEED_EMAIL)
+            label = "UserService.get_user_from_id"
+            await UserService.get_user_from_id(db, user.id)
+            label = "BoardService.get_board_from_id"
+            await BoardService.get_board_from_id(db, board_id, principal)
+            label = "BoardService.get_board_from_name"
+            await BoardService.get_board_from_name(db, "explain-1")
+            label = "BoardService.get_all_accessible_boards (page)"
+            _, cursor = await BoardService.get_all_accessible_boards(
+                db, principal, 1, 10
+            )
+            label = "BoardService.get_all_accessible_boards (cursor)"
+            await BoardService.get_all_accessible_boards(db, principal, 1, 10, cursor)
+            label = "PostService.get_post_from_id"
+            await PostService.get_post_from_id(db, post_id, principal)
+            label = "PostService.get_all_accessible_posts (page)"
+            _, cursor = await PostService.get_all_accessible_posts(
+                db, board_id, principal, 1, 10
+            )
+            label = "PostService.get_all_accessible_posts (cursor)"
+            await PostService.get_all_accessible_posts(
+                db, board_id, principal, 1, 10, cursor
+            )
+            if engine.dialect.name == "postgresql":
+                label = "PostService.search_posts"
+                await PostService.search_posts(db, "content", principal, 10)
+            label = None
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return captured
+
+
+async def explain(captured):
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    plans = []
+    async with engine.connect() as conn:
+        for label, statement, parameters in captured:
+            result = await conn.exec_driver_sql(prefix + statement, parameters)
+            lines = [" ".join(str(column) for column in row) for row in result]
+            plans.append((label, lines))
+    return plans
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--boards", type=int, default=5_000)
+    parser.add_argument("--posts", type=int, default=500_000)
+    parser.add_argument("--fail-on-seq-scan", action="store_true")
+    args = parser.parse_args()
+
+    if args.seed:
+        await seed(args.users, args.boards, args.posts)
+
+    plans = await explain(await capture_queries())
+    await engine.dispose()
+
+    seq_scans = []
+    for label, lines in plans:
+        print(f"== {label}")
+        for line in lines:
+            print(f"   {line}")
+            if SEQ_SCAN.search(line):
+                seq_scans.append(label)
+        print()
+
+    if seq_scans:
+        print("sequential scans in: " + ", ".join(sorted(set(seq_scans))))
+        if args.fail_on_seq_scan:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
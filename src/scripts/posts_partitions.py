@@ -0,0 +1,93 @@
+"""Maintain the monthly partitions of the posts table (Postgres only).
+
+    list                        attached partitions, oldest first
+    ensure                      create the partitions up to
+                                POST_PARTITIONS_MONTHS_AHEAD months ahead
+    archive --keep-months N     detach every partition older than the last N
+                                months into the archive schema, then repair
+                                Board.post_count and the board leaderboard
+        --export DIR            also COPY each detached partition to
+                                DIR/<partition>.csv
+        --drop                  drop each partition once exported
+        --dry-run               only print what would be archived
+
+Run from src/:
+    python -m scripts.posts_partitions archive --keep-months 24 --export /backups
+"""
+import argparse
+import asyncio
+import os
+from datetime import date
+
+from database import engine, session_create
+from services.boards import BoardService
+from utils.partitions import PostPartitions
+from utils.redis_manager import RedisManager
+
+
+def months_before(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def archive(partitions: PostPartitions, args):
+    cutoff = months_before(date.today().replace(day=1), args.keep_months - 1)
+    old = [name for name, month in await partitions.partitions() if month < cutoff]
+    if not old:
+        print(f"no partitions older than {cutoff:%Y-%m}")
+        return
+
+    for name in old:
+        if args.dry_run:
+            print(f"would archive {name}")
+            continue
+        await partitions.detach(name)
+        print(f"detached {name} into {PostPartitions.ARCHIVE_SCHEMA}.{name}")
+        if args.export:
+            path = os.path.join(args.export, f"{name}.csv")
+            status = await partitions.export(name, path)
+            print(f"  exported to {path} ({status})")
+            if args.drop:
+                await partitions.drop(name)
+                print("  dropped")
+
+    if not args.dry_run:
+        async with session_create() as db:
+            fixed = await BoardService.recount_post_counts(db)
+        print(f"post_count repaired on {fixed} board(s)")
+        await BoardService.reconcile_leaderboard()
+        print("board leaderboard rebuilt")
+
+
+async def main(args):
+    partitions = PostPartitions(engine)
+    try:
+        if args.command == "list":
+            for name, month in await partitions.partitions():
+                print(f"{name}  {month:%Y-%m}")
+        elif args.command == "ensure":
+            print(f"created {await partitions.ensure()} partition(s)")
+        else:
+            await archive(partitions, args)
+    finally:
+        await engine.dispose()
+        await RedisManager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    commands.add_parser("ensure")
+    archive_parser = commands.add_parser("archive")
+    archive_parser.add_argument("--keep-months", type=int, required=True)
+    archive_parser.add_argument("--export")
+    archive_parser.add_argument("--drop", action="store_true")
+    archive_parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    if args.command == "archive":
+        if args.keep_months < 1:
+            parser.error("--keep-months must be at least 1")
+        if args.drop and not args.export:
+            parser.error("--drop needs --export, the posts would be lost")
+    asyncio.run(main(args))
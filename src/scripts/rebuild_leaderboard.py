@@ -0,0 +1,23 @@
+"""Rebuild the Redis board leaderboard from the boards and posts tables.
+
+The API workers already do this every LEADERBOARD_RECONCILE_SECONDS; run it
+by hand after restoring Redis or the database.
+
+Run from src/:  python -m scripts.rebuild_leaderboard
+"""
+import asyncio
+
+from database import engine
+from services.boards import BoardService
+from utils.redis_manager import RedisManager
+
+
+async def main():
+    await BoardService.reconcile_leaderboard()
+    await engine.dispose()
+    await RedisManager.close()
+    print("board leaderboard rebuilt")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,19 @@
+"""Recount Board.post_count from the posts table.
+
+Run from src/:  python -m scripts.recount_board_posts
+"""
+import asyncio
+
+from database import engine, session_create
+from services.boards import BoardService
+
+
+async def main():
+    async with session_create() as db:
+        fixed = await BoardService.recount_post_counts(db)
+    await engine.dispose()
+    print(f"post_count repaired on {fixed} board(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
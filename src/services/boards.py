@@ -1,20 +1,56 @@
-from sqlalchemy import desc, select
-from sqlalchemy.orm import joinedload
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+from sqlalchemy import desc, insert, select, tuple_, update
 from sqlalchemy.sql.expression import func
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas import BoardSchema
-from models import Board, Post
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional
+from database import execute_read, session_create
+from schemas import (
+    BoardBatchItemSchema,
+    BoardListAdapter,
+    BoardSchema,
+    PostSchema,
+    Principal,
+)
+from models import Board, Post, truncate_to_hour
 
 from services.users import UserService
+from utils.cache import EntityCache
+from utils.leaderboard import BoardLeaderboard
+from utils.pagination import decode_cursor, encode_cursor
 
 from fastapi import HTTPException, status
 
 
 class BoardService:
+    EXPORT_BATCH_SIZE = int(os.getenv("BOARD_EXPORT_BATCH_SIZE", "1000"))
+    DETAIL_MAX_POSTS = int(os.getenv("BOARD_DETAIL_MAX_POSTS", "100"))
+    # ranked ids read per list page, private boards are filtered out after;
+    # when that page is not full, the rest of LIST_MAX_SCAN ranks is read
+    # at once: at most two hydration queries per page
+    LIST_OVERFETCH = int(os.getenv("BOARD_LIST_OVERFETCH", "3"))
+    LIST_MAX_SCAN = int(os.getenv("BOARD_LIST_MAX_SCAN", "2000"))
+    # first element of a leaderboard cursor, ("rank", offset)
+    RANK_CURSOR = "rank"
+
+    cache = EntityCache(
+        "board",
+        BoardSchema,
+        stamp_fields=("version", "is_public", "is_deleted", "creator_id"),
+    )
+    leaderboard = BoardLeaderboard()
+
     @staticmethod
-    async def create_board(db: AsyncSession, name: str, public: bool, token: str):
-        user_id = UserService.get_user_id_from_token(token)
+    async def create_board(
+        db: AsyncSession, name: str, public: bool, principal: Principal
+    ):
+        user_id = principal.user_id
         user = await UserService.get_user_from_id(db, user_id)
         if not user:
             raise HTTPException(status_code=400, detail="User does not exist")
@@ -23,22 +59,24 @@ class BoardService:
         if is_present:
             raise HTTPException(status_code=400, detail="Board already exists")
 
-        db_board = Board(
-            name=name,
-            is_public=public,
-            creator_id=user_id,
+        statement = (
+            insert(Board)
+            .values(name=name, is_public=public, creator_id=user_id)
+            .returning(Board)
         )
 
         try:
-            db.add(db_board)
+            result = await db.execute(statement)
+            db_board = result.scalar_one()
             await db.commit()
-            await db.refresh(db_board)
+            await BoardService.leaderboard.add_board(db_board.board_id)
 
             return BoardSchema(
                 name=db_board.name,
                 is_public=db_board.is_public,
                 board_id=db_board.board_id,
                 creator_id=db_board.creator_id,
+                version=db_board.version,
             )
         except OperationalError:
             db.rollback()
@@ -49,11 +87,11 @@ class BoardService:
 
     @staticmethod
     async def update_board(
-        db: AsyncSession, board_id: int, name: str, public: bool, token: str
+        db: AsyncSession, board_id: int, name: str, public: bool, principal: Principal
     ):
-        board = await BoardService.get_board_from_id(db, board_id, token)
+        board = await BoardService.get_board_from_id(db, board_id, principal)
 
-        user_id = UserService.get_user_id_from_token(token)
+        user_id = principal.user_id
         # user_id를 통해 해당 유저가 생성한 게시판인지 확인
         if board.creator_id != user_id:
             raise HTTPException(
@@ -64,64 +102,235 @@ class BoardService:
         if is_present:
             raise HTTPException(status_code=400, detail="Board already exists")
 
-        board.name = name
-        board.is_public = public
+        statement = (
+            update(Board)
+            .where(Board.board_id == board_id)
+            .where(Board.is_deleted == False)
+            .values(name=name, is_public=public, version=Board.version + 1)
+            .returning(Board)
+        )
 
         try:
+            result = await db.execute(statement)
+            db_board = result.scalar_one_or_none()
             await db.commit()
-            await db.refresh(board)
+            await BoardService.cache.invalidate(board_id)
+            if db_board is None:
+                raise HTTPException(status_code=404, detail="Board was deleted")
+
             return BoardSchema(
-                name=board.name,
-                is_public=board.is_public,
-                board_id=board.board_id,
-                creator_id=board.creator_id,
+                name=db_board.name,
+                is_public=db_board.is_public,
+                board_id=db_board.board_id,
+                creator_id=db_board.creator_id,
+                version=db_board.version,
             )
         except OperationalError:
             db.rollback()
             raise HTTPException(status_code=500, detail="DB Error")
 
     @staticmethod
-    async def delete_board(db: AsyncSession, board_id: int, token: str):
-        board = await BoardService.get_board_from_id(db, board_id, token)
+    async def delete_board(db: AsyncSession, board_id: int, principal: Principal):
+        board = await BoardService.get_board_from_id(db, board_id, principal)
 
-        user_id = UserService.get_user_id_from_token(token)
+        user_id = principal.user_id
         if board.creator_id != user_id:
             raise HTTPException(
                 status_code=403, detail="Not allowed to delete this board"
             )
         # Soft delete
-        board.is_deleted = True
+        statement = (
+            update(Board)
+            .where(Board.board_id == board_id)
+            .where(Board.is_deleted == False)
+            .values(is_deleted=True, version=Board.version + 1)
+        )
 
         try:
+            await db.execute(statement)
             await db.commit()
-            await db.refresh(board)
+            await BoardService.cache.invalidate(board_id)
+            await BoardService.leaderboard.remove_board(board_id)
             return {"message": "Board successfully deleted"}
         except OperationalError:
             db.rollback()
             raise HTTPException(status_code=500, detail="DB Error")
 
     @staticmethod
-    async def get_board_from_id(db: AsyncSession, board_id: int, token: str):
-        statement = (
-            select(Board)
-            .options(joinedload(Board.posts))
-            .where(Board.board_id == board_id)
+    async def get_board_from_id(db: AsyncSession, board_id: int, principal: Principal):
+        board = await BoardService.cache.get(board_id)
+
+        if board is None:
+            # board columns only, the posts are never needed for access checks
+            statement = select(
+                Board.board_id,
+                Board.name,
+                Board.is_public,
+                Board.is_deleted,
+                Board.creator_id,
+                Board.version,
+            ).where(Board.board_id == board_id)
+            # the row is cached for every caller: read it from the primary, a
+            # lagging replica would cache the version before the last write
+            result = await db.execute(statement)
+            db_board = result.first()
+
+            if not db_board:
+                raise HTTPException(status_code=404, detail="Board not found")
+
+            board = BoardSchema(
+                name=db_board.name,
+                is_public=db_board.is_public,
+                is_deleted=db_board.is_deleted,
+                board_id=db_board.board_id,
+                creator_id=db_board.creator_id,
+                version=db_board.version,
+            )
+            await BoardService.cache.set(board_id, board)
+
+        BoardService.check_access(
+            board.is_deleted, board.is_public, board.creator_id, principal
         )
-        result = await db.execute(statement)
-        board = result.scalars().first()
+        return board
 
-        if not board:
-            raise HTTPException(status_code=404, detail="Board not found")
+    @staticmethod
+    async def get_boards_from_ids(
+        db: AsyncSession, board_ids: List[int], principal: Principal
+    ) -> List[BoardBatchItemSchema]:
+        """Resolve `board_ids` with one IN query and return one item per id, in
+        request order. An id is "not_found" or "forbidden" where
+        get_board_from_id would have answered 404 or 403."""
+        statement = select(
+            Board.board_id,
+            Board.name,
+            Board.is_public,
+            Board.is_deleted,
+            Board.creator_id,
+            Board.version,
+        ).where(Board.board_id.in_(sorted(set(board_ids))))
+        try:
+            result = await execute_read(db, statement)
+            found = {row.board_id: row for row in result.fetchall()}
+        except OperationalError:
+            raise HTTPException(status_code=500, detail="DB Error")
 
-        if board.is_deleted:
-            raise HTTPException(status_code=404, detail="Board was deleted")
+        items = []
+        for board_id in board_ids:
+            db_board = found.get(board_id)
+            if db_board is None:
+                items.append(
+                    BoardBatchItemSchema(board_id=board_id, status="not_found")
+                )
+                continue
+            try:
+                BoardService.check_access(
+                    db_board.is_deleted,
+                    db_board.is_public,
+                    db_board.creator_id,
+                    principal,
+                )
+            except HTTPException as e:
+                items.append(
+                    BoardBatchItemSchema(
+                        board_id=board_id,
+                        status="not_found" if e.status_code == 404 else "forbidden",
+                    )
+                )
+                continue
+            items.append(
+                BoardBatchItemSchema(
+                    board_id=board_id,
+                    status="ok",
+                    board=BoardSchema.model_validate(db_board, from_attributes=True),
+                )
+            )
+        return items
 
-        user_id = UserService.get_user_id_from_token(token)
+    @staticmethod
+    def check_access(
+        is_deleted: bool, is_public: bool, creator_id: int, principal: Principal
+    ):
+        if is_deleted:
+            raise HTTPException(status_code=404, detail="Board was deleted")
 
-        if board.creator_id != user_id and not board.is_public:
+        if creator_id != principal.user_id and not is_public:
             raise HTTPException(status_code=403, detail="Access denied")
 
-        return board
+    @staticmethod
+    async def get_board_version(board_id: int, principal: Principal) -> Optional[int]:
+        """Current version of a board from the cached stamp, with the access
+        checks of get_board_from_id; None when the stamp is not cached."""
+        stamp = await BoardService.cache.get_stamp(board_id)
+        if stamp is None:
+            return None
+
+        BoardService.check_access(
+            stamp["is_deleted"], stamp["is_public"], stamp["creator_id"], principal
+        )
+        return stamp["version"]
+
+    @staticmethod
+    async def get_board_detail(
+        db: AsyncSession, board_id: int, principal: Principal, post_limit: int
+    ):
+        board = await BoardService.get_board_from_id(db, board_id, principal)
+
+        statement = (
+            select(Post)
+            .where(Post.board_id == board_id)
+            .where(Post.is_deleted == False)
+            .order_by(desc(Post.created_at), desc(Post.post_id))
+            .limit(min(post_limit, BoardService.DETAIL_MAX_POSTS))
+        )
+        try:
+            result = await db.execute(statement)
+            posts = result.scalars().fetchall()
+        except OperationalError:
+            raise HTTPException(status_code=500, detail="DB Error")
+
+        return board.model_copy(
+            update={
+                "posts": [
+                    PostSchema.model_validate(post, from_attributes=True)
+                    for post in posts
+                ]
+            }
+        )
+
+    @staticmethod
+    async def export_posts(
+        db: AsyncSession, board_id: int, principal: Principal
+    ) -> AsyncIterator[bytes]:
+        """Check access, then return a generator of the board's posts as NDJSON.
+
+        Posts are read through a server-side cursor in EXPORT_BATCH_SIZE
+        chunks on a dedicated session, so memory stays flat however large the
+        board is and the stream outlives the request-scoped session. Oldest
+        first, in ix_posts_board_id_created_at_post_id_live order.
+        """
+        await BoardService.get_board_from_id(db, board_id, principal)
+
+        statement = (
+            select(Post)
+            .where(Post.board_id == board_id)
+            .where(Post.is_deleted == False)
+            .order_by(Post.created_at, Post.post_id)
+            .execution_options(yield_per=BoardService.EXPORT_BATCH_SIZE)
+        )
+
+        async def stream():
+            async with session_create() as export_db:
+                result = await export_db.stream_scalars(statement)
+                async for posts in result.partitions():
+                    yield b"".join(
+                        PostSchema.model_validate(post, from_attributes=True)
+                        .model_dump_json()
+                        .encode()
+                        + b"\n"
+                        for post in posts
+                    )
+
+        return stream()
 
     @staticmethod
     async def get_board_from_name(db: AsyncSession, name=str):
@@ -132,48 +341,217 @@ class BoardService:
         except OperationalError:
             raise HTTPException(status_code=500, detail="Database connection error")
 
+    @staticmethod
+    def accessible_board_columns(user_id: int):
+        # board columns only: BoardSchema.posts is left to its default
+        # instead of lazy loading the relationship per row
+        return (
+            select(
+                Board.board_id,
+                Board.name,
+                Board.is_public,
+                Board.is_deleted,
+                Board.creator_id,
+                Board.post_count,
+                Board.version,
+            )
+            .where((Board.creator_id == user_id) | (Board.is_public == True))
+            .where(Board.is_deleted == False)
+        )
+
     @staticmethod
     async def get_all_accessible_boards(
-        db: AsyncSession, token: str, page: int, size: int
+        db: AsyncSession,
+        principal: Principal,
+        page: Optional[int],
+        size: int,
+        cursor: Optional[str] = None,
+        window: Optional[str] = None,
     ):
-        user_id = UserService.get_user_id_from_token(token)
+        """Accessible boards ranked by post count, or by decayed recent
+        activity over `window`.
 
-        try:
-            accessible_boards = (
-                select(Board.board_id)
-                .where((Board.creator_id == user_id) | (Board.is_public == True))
-                .subquery()
+        Without `page`, the first page and the rank cursors it hands out are
+        read from the Redis leaderboard, see ranked_boards. Every `page`
+        request, keyset cursors and requests made while the leaderboard is
+        not usable are ranked by Board.post_count in the database, so
+        numbered pages never mix two rankings (their scores and tie orders
+        differ).
+        """
+        if window is not None and window not in BoardLeaderboard.WINDOWS:
+            raise HTTPException(status_code=400, detail="Unknown window")
+
+        offset = ((page or 1) - 1) * size
+        keyset = None
+        rank_start = None
+        if cursor:
+            first, second = decode_cursor(cursor, (str, int), int)
+            if isinstance(first, int):
+                keyset = (first, second)
+            elif first == BoardService.RANK_CURSOR and second >= 0:
+                rank_start = offset = second
+            else:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        elif page is None:
+            rank_start = 0
+        elif window is not None:
+            # the database only ranks by post count
+            raise HTTPException(
+                status_code=400, detail="Page through a window with the cursor"
+            )
+
+        if rank_start is not None:
+            ranked_page = await BoardService.ranked_boards(
+                db, principal, rank_start, size, window
             )
+            if ranked_page is not None:
+                return ranked_page
 
+        try:
             sorted_boards = (
-                select(Board, func.count(Post.post_id))
-                .outerjoin_from(Board, Post, Post.board_id == Board.board_id)
-                .join_from(
-                    Board,
-                    accessible_boards,
-                    Board.board_id == accessible_boards.c.board_id,
-                )
-                .group_by(Board)
-                .where(Board.is_deleted == False)
-                .order_by(desc(func.count(Post.post_id)))
+                BoardService.accessible_board_columns(principal.user_id)
+                .order_by(desc(Board.post_count), desc(Board.board_id))
                 .limit(size)
-                .offset((page - 1) * size)
             )
+            if keyset:
+                sorted_boards = sorted_boards.where(
+                    tuple_(Board.post_count, Board.board_id) < tuple_(*keyset)
+                )
+            else:
+                sorted_boards = sorted_boards.offset(offset)
 
-            result = await db.execute(sorted_boards)
+            result = await execute_read(db, sorted_boards)
 
             board_list = result.fetchall()
 
-            return [
-                BoardSchema(
-                    name=board.name,
-                    is_public=board.is_public,
-                    is_deleted=board.is_deleted,
-                    board_id=board.board_id,
-                    creator_id=board.creator_id,
-                )
-                for board, _ in board_list
-            ]
+            next_cursor = None
+            if len(board_list) == size:
+                last_board = board_list[-1]
+                next_cursor = encode_cursor(last_board.post_count, last_board.board_id)
+
+            return (
+                BoardListAdapter.validate_python(board_list, from_attributes=True),
+                next_cursor,
+            )
 
         except OperationalError as e:
             raise HTTPException(status_code=500, detail="DB Error")
+
+    @staticmethod
+    async def ranked_boards(
+        db: AsyncSession,
+        principal: Principal,
+        start: int,
+        size: int,
+        window: Optional[str] = None,
+    ):
+        """The first `size` accessible boards of the leaderboard from rank
+        `start`, and a cursor to the rank after the last one used; None when
+        the leaderboard is not usable.
+
+        Other users' private boards are skipped. The first size *
+        LIST_OVERFETCH ranks usually fill the page; when they don't, the
+        remaining ranks up to LIST_MAX_SCAN are read in one second chunk.
+        Each chunk is hydrated with one query, so a page costs at most two.
+        A page only comes back short, with a cursor, when LIST_MAX_SCAN
+        ranks were read or Redis failed part way.
+        """
+        board_list = []
+        position = start
+        chunk = size * BoardService.LIST_OVERFETCH
+        exhausted = False
+        while len(board_list) < size and position - start < BoardService.LIST_MAX_SCAN:
+            count = min(chunk, BoardService.LIST_MAX_SCAN - (position - start))
+            ranked = await BoardService.leaderboard.page(position, count, window)
+            if ranked is None:
+                if position == start:
+                    return None
+                break
+
+            rows = {}
+            if ranked:
+                statement = BoardService.accessible_board_columns(
+                    principal.user_id
+                ).where(Board.board_id.in_(ranked))
+                try:
+                    result = await execute_read(db, statement)
+                    rows = {row.board_id: row for row in result.fetchall()}
+                except OperationalError:
+                    raise HTTPException(status_code=500, detail="DB Error")
+
+            chunk_start = position
+            for board_id in ranked:
+                position += 1
+                if board_id in rows:
+                    board_list.append(rows[board_id])
+                    if len(board_list) == size:
+                        break
+            if len(ranked) < count and position == chunk_start + len(ranked):
+                exhausted = True
+                break
+            chunk = BoardService.LIST_MAX_SCAN
+
+        next_cursor = (
+            None if exhausted else encode_cursor(BoardService.RANK_CURSOR, position)
+        )
+        return (
+            BoardListAdapter.validate_python(board_list, from_attributes=True),
+            next_cursor,
+        )
+
+    @staticmethod
+    async def rebuild_leaderboard(db: AsyncSession):
+        """Rebuild the Redis leaderboard from the boards and posts tables."""
+        post_counts = (
+            select(Board.board_id, func.count(Post.post_id))
+            .outerjoin(
+                Post, (Post.board_id == Board.board_id) & (Post.is_deleted == False)
+            )
+            .where(Board.is_deleted == False)
+            .group_by(Board.board_id)
+        )
+        since = datetime.now() - timedelta(hours=BoardLeaderboard.retention_hours())
+        hour = truncate_to_hour(Post.created_at)
+        hourly_counts = (
+            select(Post.board_id, hour, func.count())
+            .join(
+                Board, (Post.board_id == Board.board_id) & (Board.is_deleted == False)
+            )
+            .where(Post.is_deleted == False)
+            .where(Post.created_at >= since)
+            .group_by(Post.board_id, hour)
+        )
+        counts = (await db.execute(post_counts)).fetchall()
+        hourly = (await db.execute(hourly_counts)).fetchall()
+        await BoardService.leaderboard.rebuild(counts, hourly)
+
+    @staticmethod
+    async def reconcile_leaderboard():
+        async with session_create() as db:
+            await BoardService.rebuild_leaderboard(db)
+
+    @staticmethod
+    async def recount_post_counts(db: AsyncSession):
+        """Recompute Board.post_count from the posts table.
+
+        Returns the number of boards whose counter had drifted.
+        """
+        actual_count = (
+            select(func.count(Post.post_id))
+            .where(Post.board_id == Board.board_id)
+            .where(Post.is_deleted == False)
+            .scalar_subquery()
+        )
+        statement = (
+            update(Board)
+            .where(Board.post_count != actual_count)
+            .values(post_count=actual_count)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await db.execute(statement)
+            await db.commit()
+            return result.rowcount
+        except OperationalError:
+            await db.rollback()
+            raise
@@ -1,66 +1,231 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.exc import OperationalError
-from models import Post, Board
+from sqlalchemy import desc, func, insert, literal_column, select, tuple_, update
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.exc import DBAPIError, OperationalError
+from redis.exceptions import RedisError
+from database import execute_read, session_create
+from models import POST_SEARCH_CONFIG, Post, Board, post_search_document
+from schemas import (
+    BoardCascadeJobSchema,
+    PostBatchItemSchema,
+    PostBulkErrorSchema,
+    PostBulkResultSchema,
+    PostCreateSchema,
+    PostListAdapter,
+    PostSchema,
+    Principal,
+)
 
-from services.users import UserService
+from services.boards import BoardService
+from utils.cache import EntityCache
+from utils.jobs import BackgroundJobs
+from utils.pagination import decode_cursor, encode_cursor
 from fastapi import HTTPException, status
 
 
 class PostService:
+    BULK_MAX_POSTS = int(os.getenv("POST_BULK_MAX_POSTS", "5000"))
+    BULK_BATCH_SIZE = int(os.getenv("POST_BULK_BATCH_SIZE", "500"))
+    # posts soft deleted per transaction when a board is deleted
+    CASCADE_CHUNK_SIZE = int(os.getenv("POST_CASCADE_CHUNK_SIZE", "1000"))
+    CASCADE_PAUSE_SECONDS = float(os.getenv("POST_CASCADE_PAUSE_SECONDS", "0.05"))
+
+    cache = EntityCache(
+        "post", PostSchema, stamp_fields=("version", "is_deleted", "author_id")
+    )
+    cascade_jobs = BackgroundJobs("board-cascade")
+
     @staticmethod
     async def create_post(
-        db: AsyncSession, board_id: int, title: str, content: str, token: str
+        db: AsyncSession, board_id: int, title: str, content: str, principal: Principal
     ):
-        user_id = UserService.get_user_id_from_token(token)
-        db_post = Post(
-            title=title, content=content, board_id=board_id, author_id=user_id
+        user_id = principal.user_id
+        statement = (
+            insert(Post)
+            .values(title=title, content=content, board_id=board_id, author_id=user_id)
+            .returning(Post)
         )
         try:
-            db.add(db_post)
+            result = await db.execute(statement)
+            db_post = result.scalar_one()
+            await db.execute(
+                update(Board)
+                .where(Board.board_id == board_id)
+                .values(post_count=Board.post_count + 1)
+            )
             await db.commit()
-            await db.refresh(db_post)
+            await BoardService.leaderboard.record_posts(board_id, db_post.created_at, 1)
             return db_post
         except OperationalError:
             db.rollback()
             raise HTTPException(status_code=500, detail="DB Error")
 
+    @staticmethod
+    async def bulk_create_posts(
+        db: AsyncSession,
+        board_id: int,
+        posts: List[PostCreateSchema],
+        principal: Principal,
+    ):
+        if len(posts) > PostService.BULK_MAX_POSTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {PostService.BULK_MAX_POSTS} posts per request",
+            )
+
+        # 게시판 접근 권한은 한 번만 확인
+        await BoardService.get_board_from_id(db, board_id, principal)
+
+        post_ids: List[Optional[int]] = [None] * len(posts)
+        errors: List[PostBulkErrorSchema] = []
+
+        rows = []
+        for index, post in enumerate(posts):
+            if not post.title.strip():
+                errors.append(
+                    PostBulkErrorSchema(index=index, detail="Title must not be empty")
+                )
+                continue
+            rows.append(
+                (
+                    index,
+                    {
+                        "title": post.title,
+                        "content": post.content,
+                        "board_id": board_id,
+                        "author_id": principal.user_id,
+                    },
+                )
+            )
+
+        statement = insert(Post).returning(Post.post_id, sort_by_parameter_order=True)
+        batch_size = max(1, PostService.BULK_BATCH_SIZE)
+
+        try:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                try:
+                    async with db.begin_nested():
+                        result = await db.execute(
+                            statement, [values for _, values in batch]
+                        )
+                        inserted = result.scalars().all()
+                except DBAPIError as e:
+                    if isinstance(e, OperationalError):
+                        raise
+                    # isolate the offending rows so the rest of the batch lands
+                    inserted = []
+                    for index, values in batch:
+                        try:
+                            async with db.begin_nested():
+                                result = await db.execute(statement, [values])
+                                inserted.append(result.scalar_one())
+                        except DBAPIError as row_error:
+                            if isinstance(row_error, OperationalError):
+                                raise
+                            # the driver message can name tables and constraints
+                            print(f"Bulk post row {index} rejected: {row_error.orig}")
+                            inserted.append(None)
+                            errors.append(
+                                PostBulkErrorSchema(index=index, detail="invalid row")
+                            )
+
+                for (index, _), post_id in zip(batch, inserted):
+                    post_ids[index] = post_id
+
+            created = sum(1 for post_id in post_ids if post_id is not None)
+            if created:
+                await db.execute(
+                    update(Board)
+                    .where(Board.board_id == board_id)
+                    .values(post_count=Board.post_count + created)
+                )
+            await db.commit()
+        except OperationalError:
+            await db.rollback()
+            raise HTTPException(status_code=500, detail="DB Error")
+
+        if created:
+            await BoardService.leaderboard.record_posts(
+                board_id, datetime.now(), created
+            )
+        errors.sort(key=lambda error: error.index)
+        return PostBulkResultSchema(board_id=board_id, post_ids=post_ids, errors=errors)
+
     @staticmethod
     async def update_post(
-        db: AsyncSession, post_id: int, title: str, content: str, token: str
+        db: AsyncSession, post_id: int, title: str, content: str, principal: Principal
     ):
-        post = await PostService.get_post_from_id(db, post_id, token)
+        post = await PostService.get_post_from_id(db, post_id, principal)
 
-        user_id = UserService.get_user_id_from_token(token)
+        user_id = principal.user_id
         if post.author_id != user_id:
             raise HTTPException(
                 status_code=403, detail="Not allowed to update this post"
             )
-        post.title = title
-        post.content = content
+        statement = (
+            update(Post)
+            .where(Post.post_id == post_id)
+            # the partition key, so only the post's partition is searched
+            .where(Post.created_at == post.created_at)
+            .where(Post.is_deleted == False)
+            .values(title=title, content=content, version=Post.version + 1)
+            .returning(Post)
+        )
         try:
+            result = await db.execute(statement)
+            db_post = result.scalar_one_or_none()
             await db.commit()
-            await db.refresh(post)
-            return post
+            await PostService.cache.invalidate(post_id)
+            if db_post is None:
+                raise HTTPException(status_code=403, detail="Post was deleted")
+
+            return db_post
         except OperationalError:
             db.rollback()
             raise HTTPException(status_code=500, detail="DB Error")
 
     @staticmethod
-    async def delete_post(db: AsyncSession, post_id: int, token: str):
-        post = await PostService.get_post_from_id(db, post_id, token)
+    async def delete_post(db: AsyncSession, post_id: int, principal: Principal):
+        post = await PostService.get_post_from_id(db, post_id, principal)
 
-        user_id = UserService.get_user_id_from_token(token)
+        user_id = principal.user_id
         if post.author_id != user_id:
             raise HTTPException(
                 status_code=403, detail="Not allowed to delete this post"
             )
 
-        post.is_deleted = True
+        statement = (
+            update(Post)
+            .where(Post.post_id == post_id)
+            .where(Post.created_at == post.created_at)
+            .where(Post.is_deleted == False)
+            .values(is_deleted=True, version=Post.version + 1)
+        )
 
         try:
+            result = await db.execute(statement)
+            # a concurrent delete may already have flipped the row
+            if result.rowcount:
+                await db.execute(
+                    update(Board)
+                    .where(Board.board_id == post.board_id)
+                    .values(post_count=Board.post_count - 1)
+                )
             await db.commit()
-            await db.refresh(post)
+            await PostService.cache.invalidate(post_id)
+            if result.rowcount:
+                await BoardService.leaderboard.record_posts(
+                    post.board_id, post.created_at, -1
+                )
             return {"message": "Board successfully deleted"}
 
         except OperationalError:
@@ -68,56 +233,277 @@ class PostService:
             raise HTTPException(status_code=500, detail="DB Error")
 
     @staticmethod
-    async def get_post_from_id(db: AsyncSession, post_id: int, token: str):
+    async def get_post_from_id(db: AsyncSession, post_id: int, principal: Principal):
         try:
-            statement = select(Post).where(Post.post_id == post_id)
-            result = await db.execute(statement)
-            post = result.scalars().first()
+            post = await PostService.cache.get(post_id)
 
-            if not post:
-                raise HTTPException(status_code=404, detail="Post not found")
+            if post is None:
+                statement = select(Post).where(Post.post_id == post_id)
+                # cached for every caller, so read from the primary (see
+                # BoardService.get_board_from_id)
+                result = await db.execute(statement)
+                db_post = result.scalars().first()
 
-            if post.is_deleted:
-                raise HTTPException(status_code=403, detail="Post was deleted")
+                if not db_post:
+                    raise HTTPException(status_code=404, detail="Post not found")
 
-            user_id = UserService.get_user_id_from_token(token)
+                post = PostSchema.model_validate(db_post, from_attributes=True)
+                await PostService.cache.set(post_id, post)
 
-            if post.author_id != user_id:
-                raise HTTPException(status_code=403, detail="Access denied")
+            PostService.check_access(post.is_deleted, post.author_id, principal)
             return post
 
         except OperationalError:
             raise HTTPException(status_code=500, detail="DB Error")
 
+    @staticmethod
+    async def get_posts_from_ids(
+        db: AsyncSession, post_ids: List[int], principal: Principal
+    ) -> List[PostBatchItemSchema]:
+        """Resolve `post_ids` with one IN query and return one item per id, in
+        request order. An id is "not_found" or "forbidden" where
+        get_post_from_id would have answered 404 or 403."""
+        statement = select(Post).where(Post.post_id.in_(sorted(set(post_ids))))
+        try:
+            result = await execute_read(db, statement)
+            found = {post.post_id: post for post in result.scalars().all()}
+        except OperationalError:
+            raise HTTPException(status_code=500, detail="DB Error")
+
+        items = []
+        for post_id in post_ids:
+            db_post = found.get(post_id)
+            if db_post is None:
+                items.append(PostBatchItemSchema(post_id=post_id, status="not_found"))
+                continue
+            try:
+                PostService.check_access(
+                    db_post.is_deleted, db_post.author_id, principal
+                )
+            except HTTPException as e:
+                items.append(
+                    PostBatchItemSchema(
+                        post_id=post_id,
+                        status="not_found" if e.status_code == 404 else "forbidden",
+                    )
+                )
+                continue
+            items.append(
+                PostBatchItemSchema(
+                    post_id=post_id,
+                    status="ok",
+                    post=PostSchema.model_validate(db_post, from_attributes=True),
+                )
+            )
+        return items
+
+    @staticmethod
+    def check_access(is_deleted: bool, author_id: int, principal: Principal):
+        if is_deleted:
+            raise HTTPException(status_code=403, detail="Post was deleted")
+
+        if author_id != principal.user_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+    @staticmethod
+    async def get_post_version(post_id: int, principal: Principal) -> Optional[int]:
+        """Current version of a post from the cached stamp, with the access
+        checks of get_post_from_id; None when the stamp is not cached."""
+        stamp = await PostService.cache.get_stamp(post_id)
+        if stamp is None:
+            return None
+
+        PostService.check_access(stamp["is_deleted"], stamp["author_id"], principal)
+        return stamp["version"]
+
+    @staticmethod
+    def list_statement(
+        board_id: int, size: int, page: int = 1, cursor: Optional[str] = None
+    ):
+        # 최신순 정렬, (created_at, post_id) 인덱스를 그대로 탄다
+        statement = (
+            select(Post)
+            .where(Post.board_id == board_id)
+            .where(Post.is_deleted == False)
+            .order_by(desc(Post.created_at), desc(Post.post_id))
+            .limit(size)
+        )
+        if cursor:
+            created_at, post_id = decode_cursor(cursor, datetime, int)
+            statement = statement.where(
+                tuple_(Post.created_at, Post.post_id) < tuple_(created_at, post_id)
+            )
+            # implied by the row comparison, but only a plain bound on the
+            # partition key prunes the newer partitions
+            statement = statement.where(Post.created_at <= created_at)
+        else:
+            statement = statement.offset((page - 1) * size)
+        return statement
+
     @staticmethod
     async def get_all_accessible_posts(
-        db: AsyncSession, board_id: int, token: str, page: int, size: int
+        db: AsyncSession,
+        board_id: int,
+        principal: Principal,
+        page: int,
+        size: int,
+        cursor: Optional[str] = None,
     ):
-        user_id = UserService.get_user_id_from_token(token)
+        # a deleted board's posts are soft deleted with it (see
+        # cascade_board_delete), so the posts need no join on boards
+        await BoardService.get_board_from_id(db, board_id, principal)
 
+        statement = PostService.list_statement(board_id, size, page, cursor)
         try:
-            statement = (
-                select(Post)
-                .join(
-                    Board,
-                    (Post.board_id == Board.board_id) & (Board.is_deleted == False),
-                )
-                .filter(((Board.creator_id == user_id) | (Board.is_public == True)))
-                .where(Post.is_deleted == False)
-                .limit(size)
-                .offset((page - 1) * size)
+            result = await execute_read(db, statement)
+            accessible_posts = PostListAdapter.validate_python(
+                result.scalars().fetchall(), from_attributes=True
             )
-            result = await db.execute(statement)
-            accessible_posts = result.scalars().fetchall()
+        except OperationalError:
+            raise HTTPException(status_code=500, detail="DB error")
+
+        next_cursor = None
+        if len(accessible_posts) == size:
+            last = accessible_posts[-1]
+            next_cursor = encode_cursor(last.created_at, last.post_id)
+
+        return accessible_posts, next_cursor
+
+    @staticmethod
+    async def start_board_cascade(board_id: int, principal: Principal):
+        """Soft delete a deleted board's posts in the background."""
+        await PostService.cascade_jobs.submit(
+            board_id,
+            lambda: PostService.cascade_board_delete(board_id),
+            owner_id=principal.user_id,
+            posts_deleted=0,
+        )
+
+    @staticmethod
+    async def cascade_board_delete(board_id: int) -> int:
+        """Soft delete the live posts of board `board_id`.
 
-            return accessible_posts
+        Set-based UPDATEs of at most CASCADE_CHUNK_SIZE posts, each in its own
+        short transaction, until none are left. Safe to rerun. Returns the
+        number of posts deleted.
+        """
+        # the full primary key: on Postgres each id is looked up in its own
+        # partition instead of in the post_id index of every partition
+        chunk = (
+            select(Post.post_id, Post.created_at)
+            .where(Post.board_id == board_id)
+            .where(Post.is_deleted == False)
+            .limit(PostService.CASCADE_CHUNK_SIZE)
+        )
+        statement = (
+            update(Post)
+            .where(tuple_(Post.post_id, Post.created_at).in_(chunk))
+            .values(is_deleted=True, version=Post.version + 1)
+            .returning(Post.post_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        deleted = 0
+        async with session_create() as db:
+            while True:
+                result = await db.execute(statement)
+                post_ids = result.scalars().all()
+                if post_ids:
+                    await db.execute(
+                        update(Board)
+                        .where(Board.board_id == board_id)
+                        .values(post_count=Board.post_count - len(post_ids))
+                    )
+                await db.commit()
+                if not post_ids:
+                    return deleted
+
+                deleted += len(post_ids)
+                await PostService.cache.invalidate_many(post_ids)
+                await PostService.cascade_jobs.update(board_id, posts_deleted=deleted)
+                await asyncio.sleep(PostService.CASCADE_PAUSE_SECONDS)
+
+    @staticmethod
+    async def get_board_cascade(
+        board_id: int, principal: Principal
+    ) -> BoardCascadeJobSchema:
+        try:
+            job = await PostService.cascade_jobs.get(board_id)
+        except RedisError:
+            raise HTTPException(status_code=503, detail="Job status unavailable")
+
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if int(job["owner_id"]) != principal.user_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+        return BoardCascadeJobSchema(board_id=board_id, **job)
+
+    @staticmethod
+    def search_statement(
+        user_id: int,
+        query: str,
+        size: int,
+        board_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
+        document = post_search_document(Post.title, Post.content)
+        ts_query = func.websearch_to_tsquery(
+            literal_column(f"'{POST_SEARCH_CONFIG}'::regconfig"), query
+        )
+        rank = func.ts_rank_cd(document, ts_query)
 
+        statement = (
+            select(Post, rank)
+            .join(
+                Board,
+                (Post.board_id == Board.board_id) & (Board.is_deleted == False),
+            )
+            .filter(((Board.creator_id == user_id) | (Board.is_public == True)))
+            .where(Post.is_deleted == False)
+            .where(document.op("@@")(ts_query))
+            .order_by(desc(rank), desc(Post.post_id))
+            .limit(size)
+        )
+        if board_id is not None:
+            statement = statement.where(Post.board_id == board_id)
+        if cursor:
+            last_rank, last_post_id = decode_cursor(cursor, (int, float), int)
+            statement = statement.where(
+                tuple_(rank, Post.post_id) < tuple_(last_rank, last_post_id)
+            )
+        return statement
+
+    @staticmethod
+    async def search_posts(
+        db: AsyncSession,
+        query: str,
+        principal: Principal,
+        size: int,
+        board_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
+        statement = PostService.search_statement(
+            principal.user_id, query, size, board_id, cursor
+        )
+        try:
+            result = await db.execute(statement)
+            rows = result.fetchall()
         except OperationalError:
             raise HTTPException(status_code=500, detail="DB error")
 
+        next_cursor = None
+        if len(rows) == size:
+            last_post, last_rank = rows[-1]
+            next_cursor = encode_cursor(last_rank, last_post.post_id)
+
+        posts = PostListAdapter.validate_python(
+            [post for post, _ in rows], from_attributes=True
+        )
+        return posts, next_cursor
+
     # @staticmethod
-    # async def get_board_from_post_id(db: AsyncSession, post_id: int, token: str):
-    #     post = await PostService.get_post_from_id(db, post_id, token)
+    # async def get_board_from_post_id(db: AsyncSession, post_id: int, principal: Principal):
+    #     post = await PostService.get_post_from_id(db, post_id, principal)
     #     try:
     #         statement = select(Board).where(Board.board_id == post.board_id)
     #         result = await db.execute(statement)
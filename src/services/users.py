@@ -4,44 +4,60 @@ import os
 dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
 load_dotenv(dotenv_path)
 
+import hashlib
+import uuid
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import OperationalError
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from database import execute_read, set_sticky_key
 
 from redis.exceptions import RedisError
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi import HTTPException, status
+from fastapi import Depends, HTTPException, status
 from models import User
 
-from utils.redis_manager import RedisManager
-from schemas import UserBaseSchema, UserCreateSchema
+from utils.passwords import PasswordHasher
+from utils.sessions import SessionRevocations
+from utils.token_cache import VerifiedTokenCache
+from schemas import Principal, UserBaseSchema, UserCreateSchema
 
 
 class UserService:
     SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     ALGORITHM = os.getenv("JWT_ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
 
     redis = None
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    password_hasher = PasswordHasher(
+        pwd_context,
+        workers=PASSWORD_HASH_WORKERS,
+        max_pending=PASSWORD_HASH_MAX_PENDING,
+        queue_timeout=PASSWORD_HASH_QUEUE_TIMEOUT,
+    )
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token")
+    token_cache = VerifiedTokenCache(int(os.getenv("TOKEN_CACHE_SIZE", "10000")))
+    revocations = SessionRevocations()
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str):
-        return UserService.pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(plain_password: str, hashed_password: str):
+        return await UserService.password_hasher.verify(plain_password, hashed_password)
 
     @staticmethod
-    def get_password_hash(password: str):
-        return UserService.pwd_context.hash(password)
+    async def get_password_hash(password: str):
+        return await UserService.password_hasher.hash(password)
 
     @staticmethod
     async def get_user_from_email(db: AsyncSession, email: str):
         try:
             statement = select(User).where(User.email == email)
-            result = await db.execute(statement)
+            result = await execute_read(db, statement)
 
             return result.scalars().first()
         except OperationalError:
@@ -57,12 +73,17 @@ class UserService:
             raise HTTPException(status_code=500, detail="Database connection error")
 
     @staticmethod
-    def get_user_id_from_token(token: str):
+    def get_principal_from_token(token: str) -> Principal:
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+        token_digest = hashlib.sha256(token.encode()).hexdigest()
+        principal = UserService.token_cache.get(token_digest)
+        if principal is not None:
+            return principal
+
         try:
             payload = jwt.decode(
                 token,
@@ -70,8 +91,12 @@ class UserService:
                 algorithms=[UserService.ALGORITHM],
                 # options={"verify_signature": False}, # for debugging
             )
-            user_id = int(payload.get("sub"))
-            return user_id
+            principal = Principal(
+                user_id=int(payload.get("sub")),
+                expires_at=payload.get("exp"),
+                token_digest=token_digest,
+                session_id=payload.get("jti"),
+            )
 
         except JWTError as e:
             print(f"JWTError: {e}")
@@ -80,12 +105,33 @@ class UserService:
             # print(f"Unexpected error: {e}")
             raise HTTPException(status_code=401, detail="Invalid token")
 
+        UserService.token_cache.put(principal)
+        return principal
+
+    @staticmethod
+    def get_user_id_from_token(token: str):
+        return UserService.get_principal_from_token(token).user_id
+
+    @staticmethod
+    async def get_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+        """FastAPI dependency: decode and verify the bearer token once."""
+        principal = UserService.get_principal_from_token(token)
+        if await UserService.revocations.is_revoked(principal.session_id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        # read-your-writes: this caller's reads stick to the primary after a write
+        set_sticky_key(principal.user_id)
+        return principal
+
     @staticmethod
     async def authenticate_user(db: AsyncSession, email: str, password: str):
         user = await UserService.get_user_from_email(db, email)
         if not user:
             return False
-        if not UserService.verify_password(password, user.hash_password):
+        if not await UserService.verify_password(password, user.hash_password):
             return False
         return user
 
@@ -94,6 +140,7 @@ class UserService:
         to_encode = data.copy()
 
         to_encode["sub"] = str(to_encode["sub"])
+        to_encode["jti"] = uuid.uuid4().hex
 
         expire = datetime.utcnow() + expires_delta
         to_encode.update({"exp": expire})
@@ -102,16 +149,6 @@ class UserService:
             to_encode, UserService.SECRET_KEY, algorithm=UserService.ALGORITHM
         )
 
-        try:
-            redis = await RedisManager.get_connection()
-            await redis.set(
-                data["sub"],
-                encoded_jwt,
-                ex=expires_delta.seconds if expires_delta else 900,
-            )
-        except RedisError:
-            raise HTTPException(status_code=500, detail="Failed to connect to Redis")
-
         return encoded_jwt
 
     @staticmethod
@@ -120,16 +157,15 @@ class UserService:
         if is_present:
             raise HTTPException(status_code=400, detail="Email already exists")
 
-        hashed_password = UserService.get_password_hash(user.password)
-        db_user = User(
+        hashed_password = await UserService.get_password_hash(user.password)
+        statement = insert(User).values(
             email=user.email, fullname=user.fullname, hash_password=hashed_password
         )
         try:
-            db.add(db_user)
+            await db.execute(statement)
             await db.commit()
-            await db.refresh(db_user)
 
-            return UserBaseSchema(fullname=db_user.fullname, email=db_user.email)
+            return UserBaseSchema(fullname=user.fullname, email=user.email)
         except OperationalError:
             db.rollback()
             raise HTTPException(status_code=500, detail="Database error")
@@ -160,44 +196,38 @@ class UserService:
         return {"access_token": access_token, "token_type": "bearer"}
 
     @staticmethod
-    async def get_current_user(db: AsyncSession, token: str):
+    async def get_current_user(db: AsyncSession, principal: Principal):
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-        try:
-            payload = jwt.decode(
-                token, UserService.SECRET_KEY, algorithms=[UserService.ALGORITHM]
-            )
-            user_id: int = int(payload.get("sub"))
-            if user_id is None:
-                raise credentials_exception
-
-            user = await UserService.get_user_from_id(db, user_id=user_id)
-            if user is None:
-                raise credentials_exception
-
-            return user
-
-        except JWTError:
-            raise credentials_exception
-        except Exception as e:
-            print(e)
+        user = await UserService.get_user_from_id(db, user_id=principal.user_id)
+        if user is None:
             raise credentials_exception
 
+        return user
+
     @staticmethod
-    async def logout_user(db: AsyncSession, token: str):
+    async def logout_user(db: AsyncSession, principal: Principal):
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
         try:
-            redis = await RedisManager.get_connection()
-            user = await UserService.get_current_user(db, token)
+            user = await UserService.get_current_user(db, principal)
             if user:
-                await redis.delete(user.id)
+                if principal.session_id is None:
+                    # issued before tokens carried a jti: nothing to revoke
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="This token cannot be revoked; "
+                        "it stays valid until it expires",
+                    )
+                await UserService.revocations.revoke(
+                    principal.session_id, principal.expires_at
+                )
                 return {"detail": "Successfully logged out"}
 
         except RedisError:
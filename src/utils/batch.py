@@ -0,0 +1,29 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+from typing import List
+
+from fastapi import HTTPException, Query
+
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+
+def batch_ids(
+    ids: str = Query(..., description="Comma separated ids, e.g. 1,2,3")
+) -> List[int]:
+    """Route dependency parsing `?ids=` into a list of ids, in request order."""
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers")
+
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(parsed) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {BATCH_MAX_IDS} ids per request"
+        )
+    return parsed
@@ -0,0 +1,128 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+import json
+from typing import Iterable, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from utils.redis_manager import RedisManager
+
+
+class EntityCache:
+    """Read-through cache of serialized schemas in Redis, keyed by entity id.
+
+    The key embeds `VERSION`; bump it whenever a cached schema changes shape so
+    old entries are ignored instead of failing validation. Redis errors are
+    treated as misses, the caller falls back to the database.
+
+    With `stamp_fields`, a second, small entry holding only those fields (the
+    version and whatever access checks need) is kept alongside, so
+    conditional requests can be answered without loading the whole schema.
+    """
+
+    VERSION = 2
+    TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+
+    def __init__(
+        self, kind: str, schema: Type[BaseModel], stamp_fields: Tuple[str, ...] = ()
+    ):
+        self.kind = kind
+        self.schema = schema
+        self.stamp_fields = set(stamp_fields)
+        # per-process counters
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.stamp_hits = 0
+        self.stamp_misses = 0
+
+    def key(self, entity_id: int) -> str:
+        return f"cache:v{EntityCache.VERSION}:{self.kind}:{entity_id}"
+
+    def stamp_key(self, entity_id: int) -> str:
+        return self.key(entity_id) + ":stamp"
+
+    async def get_stamp(self, entity_id: int) -> Optional[dict]:
+        try:
+            redis = await RedisManager.get_connection()
+            raw = await redis.get(self.stamp_key(entity_id))
+        except RedisError:
+            self.errors += 1
+            raw = None
+
+        if raw is None:
+            self.stamp_misses += 1
+            return None
+
+        self.stamp_hits += 1
+        return json.loads(raw)
+
+    async def get(self, entity_id: int) -> Optional[BaseModel]:
+        try:
+            redis = await RedisManager.get_connection()
+            raw = await redis.get(self.key(entity_id))
+        except RedisError:
+            self.errors += 1
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self.schema.model_validate_json(raw)
+
+    async def set(self, entity_id: int, value: BaseModel):
+        try:
+            redis = await RedisManager.get_connection()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(
+                    self.key(entity_id),
+                    value.model_dump_json(),
+                    ex=EntityCache.TTL_SECONDS,
+                )
+                if self.stamp_fields:
+                    pipe.set(
+                        self.stamp_key(entity_id),
+                        value.model_dump_json(include=self.stamp_fields),
+                        ex=EntityCache.TTL_SECONDS,
+                    )
+                await pipe.execute()
+        except RedisError:
+            self.errors += 1
+
+    async def invalidate(self, entity_id: int):
+        try:
+            redis = await RedisManager.get_connection()
+            await redis.delete(self.key(entity_id), self.stamp_key(entity_id))
+        except RedisError:
+            self.errors += 1
+
+    async def invalidate_many(self, entity_ids: Iterable[int]):
+        keys = []
+        for entity_id in entity_ids:
+            keys += [self.key(entity_id), self.stamp_key(entity_id)]
+        if not keys:
+            return
+        try:
+            redis = await RedisManager.get_connection()
+            await redis.delete(*keys)
+        except RedisError:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "stamp_hits": self.stamp_hits,
+            "stamp_misses": self.stamp_misses,
+            "ttl_seconds": EntityCache.TTL_SECONDS,
+        }
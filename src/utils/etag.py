@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import Response
+
+
+def entity_etag(kind: str, entity_id: int, version: int) -> str:
+    """Strong ETag of an entity's representation at `version`."""
+    return f'"{kind}-{entity_id}-v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, a W/ prefix is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,46 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+import hmac
+import ipaddress
+from typing import Optional
+
+from fastapi import Header, HTTPException, Request
+
+# sent as X-Internal-Token; unset disables token access
+INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN", "")
+# comma separated addresses or networks let in without a token. Loopback by
+# default: clear it when a proxy on the same host forwards public traffic,
+# every request then comes from 127.0.0.1
+INTERNAL_ALLOWED_NETWORKS = [
+    ipaddress.ip_network(network.strip())
+    for network in os.getenv("INTERNAL_ALLOWED_NETWORKS", "127.0.0.1,::1").split(",")
+    if network.strip()
+]
+
+
+def internal_only(
+    request: Request, x_internal_token: Optional[str] = Header(None)
+) -> None:
+    """Route dependency for operational endpoints (/internal/*, /metrics):
+    only callers from INTERNAL_ALLOWED_NETWORKS or presenting INTERNAL_TOKEN
+    get through, everyone else gets 404."""
+    if INTERNAL_TOKEN and x_internal_token is not None:
+        if hmac.compare_digest(x_internal_token.encode(), INTERNAL_TOKEN.encode()):
+            return
+
+    if request.client is not None:
+        try:
+            address = ipaddress.ip_address(request.client.host)
+        except ValueError:
+            address = None
+        if address is not None and any(
+            address in network for network in INTERNAL_ALLOWED_NETWORKS
+        ):
+            return
+
+    # not 403: the endpoints are not advertised to outside callers
+    raise HTTPException(status_code=404, detail="Not Found")
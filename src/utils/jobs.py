@@ -0,0 +1,93 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+import asyncio
+import contextvars
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Set
+
+from redis.exceptions import RedisError
+
+from utils.redis_manager import RedisManager
+
+
+class BackgroundJobs:
+    """Jobs run in the background of the worker that started them.
+
+    A job's progress is a Redis hash `job:{kind}:{job_id}` (state, timestamps
+    and whatever fields the job reports through `update`), kept for
+    TTL_SECONDS after its last update so it can be polled from any worker.
+    Jobs run detached from the request that started them: they outlive it
+    and their SQL is not counted in its metrics or query budget. A job
+    cut short by a restart stays "running"; rerun it with the matching
+    script.
+    """
+
+    KEY_PREFIX = "job:"
+    TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "86400"))
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._tasks: Set[asyncio.Task] = set()
+
+    def key(self, job_id) -> str:
+        return f"{BackgroundJobs.KEY_PREFIX}{self.kind}:{job_id}"
+
+    async def update(self, job_id, **fields):
+        try:
+            redis = await RedisManager.get_connection()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hset(self.key(job_id), mapping=fields)
+                pipe.expire(self.key(job_id), BackgroundJobs.TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            print(f"Could not record {self.kind} job {job_id}: {e}")
+
+    async def get(self, job_id) -> Optional[dict]:
+        """The job's fields, None when unknown or expired; raises RedisError."""
+        redis = await RedisManager.get_connection()
+        return await redis.hgetall(self.key(job_id)) or None
+
+    async def _run(self, job_id, job: Callable[[], Awaitable[None]]):
+        await self.update(
+            job_id, state="running", started_at=datetime.now().isoformat()
+        )
+        try:
+            await job()
+        except asyncio.CancelledError:
+            await self.update(
+                job_id,
+                state="failed",
+                error="interrupted",
+                finished_at=datetime.now().isoformat(),
+            )
+            raise
+        except Exception as e:
+            print(f"{self.kind} job {job_id} failed: {e}")
+            await self.update(
+                job_id,
+                state="failed",
+                error=str(e),
+                finished_at=datetime.now().isoformat(),
+            )
+        else:
+            await self.update(
+                job_id, state="done", finished_at=datetime.now().isoformat()
+            )
+
+    async def submit(self, job_id, job: Callable[[], Awaitable[None]], **fields):
+        """Record the job as pending with `fields`, then start it."""
+        await self.update(job_id, state="pending", **fields)
+        # an empty context, so the request's query counter and metrics
+        # sample are not inherited
+        task = contextvars.Context().run(asyncio.create_task, self._run(job_id, job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,213 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from utils.redis_manager import RedisManager
+
+
+class BoardLeaderboard:
+    """Board activity rankings kept in Redis sorted sets.
+
+    ALL_TIME_KEY scores every live board by its number of live posts, the
+    /boards/list ranking. Posts are also counted per hour of creation in
+    `{BUCKET_PREFIX}{hour}` sets that expire once they fall out of the
+    longest window. A windowed ranking ("hot in the last 24h") is the
+    ZUNIONSTORE of its hourly buckets, each weighted by
+    0.5 ** (age_hours / HALF_LIFE_HOURS) so recent posts count more; the
+    union is kept for WINDOW_TTL_SECONDS and recomputed on the next read.
+
+    Writes are best effort: Redis errors are swallowed and the drift is
+    repaired by the periodic `rebuild`. Readers must check `ready`, which is
+    False until the first rebuild (or after Redis lost the data), and fall
+    back to the database.
+    """
+
+    ALL_TIME_KEY = "leaderboard:boards"
+    BUCKET_PREFIX = "leaderboard:boards:hour:"
+    WINDOW_PREFIX = "leaderboard:boards:window:"
+    # set by rebuild, rankings are only trusted while it exists
+    BUILT_KEY = "leaderboard:boards:built"
+    LOCK_KEY = "leaderboard:boards:lock"
+
+    # window name -> hours
+    WINDOWS = {"24h": 24, "7d": 24 * 7}
+    HALF_LIFE_HOURS = float(os.getenv("LEADERBOARD_HALF_LIFE_HOURS", "6"))
+    WINDOW_TTL_SECONDS = int(os.getenv("LEADERBOARD_WINDOW_TTL_SECONDS", "30"))
+    RECONCILE_SECONDS = int(os.getenv("LEADERBOARD_RECONCILE_SECONDS", "300"))
+    REBUILD_CHUNK_SIZE = 1000
+
+    def __init__(self):
+        self._reconciler: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def hour_of(created_at: datetime) -> int:
+        return int(created_at.timestamp() // 3600)
+
+    @staticmethod
+    def retention_hours() -> int:
+        return max(BoardLeaderboard.WINDOWS.values())
+
+    def bucket_key(self, hour: int) -> str:
+        return f"{BoardLeaderboard.BUCKET_PREFIX}{hour}"
+
+    def bucket_ttl(self, hour: int) -> int:
+        expires_at = (hour + BoardLeaderboard.retention_hours() + 1) * 3600
+        return max(int(expires_at - time.time()), 1)
+
+    async def add_board(self, board_id: int):
+        try:
+            redis = await RedisManager.get_connection()
+            await redis.zadd(BoardLeaderboard.ALL_TIME_KEY, {board_id: 0}, nx=True)
+        except RedisError:
+            pass
+
+    async def remove_board(self, board_id: int):
+        try:
+            redis = await RedisManager.get_connection()
+            await redis.zrem(BoardLeaderboard.ALL_TIME_KEY, board_id)
+        except RedisError:
+            pass
+
+    async def record_posts(self, board_id: int, created_at: datetime, count: int):
+        """Add `count` posts (negative for deletes) created at `created_at`."""
+        hour = BoardLeaderboard.hour_of(created_at)
+        in_window = hour > BoardLeaderboard.hour_of(datetime.now()) - (
+            BoardLeaderboard.retention_hours()
+        )
+        try:
+            redis = await RedisManager.get_connection()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.zincrby(BoardLeaderboard.ALL_TIME_KEY, count, board_id)
+                if in_window:
+                    pipe.zincrby(self.bucket_key(hour), count, board_id)
+                    pipe.expire(self.bucket_key(hour), self.bucket_ttl(hour))
+                await pipe.execute()
+        except RedisError:
+            pass
+
+    async def _window_key(self, redis, window: str) -> str:
+        key = f"{BoardLeaderboard.WINDOW_PREFIX}{window}"
+        if await redis.exists(key):
+            return key
+
+        current = BoardLeaderboard.hour_of(datetime.now())
+        weights = {
+            self.bucket_key(current - age): 0.5
+            ** (age / BoardLeaderboard.HALF_LIFE_HOURS)
+            for age in range(BoardLeaderboard.WINDOWS[window])
+        }
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zunionstore(key, weights)
+            pipe.expire(key, BoardLeaderboard.WINDOW_TTL_SECONDS)
+            await pipe.execute()
+        return key
+
+    async def page(
+        self, start: int, count: int, window: Optional[str] = None
+    ) -> Optional[List[int]]:
+        """Board ids ranked start..start+count-1, best first; None when the
+        leaderboard is not usable and the caller should query the database.
+
+        Ties are broken by board id in descending lexicographic order.
+        """
+        try:
+            redis = await RedisManager.get_connection()
+            if not await redis.exists(BoardLeaderboard.BUILT_KEY):
+                return None
+            key = (
+                await self._window_key(redis, window)
+                if window
+                else BoardLeaderboard.ALL_TIME_KEY
+            )
+            members = await redis.zrevrange(key, start, start + count - 1)
+        except RedisError:
+            return None
+        return [int(member) for member in members]
+
+    async def rebuild(
+        self,
+        post_counts: Iterable[Tuple[int, int]],
+        hourly_counts: Iterable[Tuple[int, datetime, int]],
+    ):
+        """Replace every ranking with the given data, atomically per key.
+
+        `post_counts` holds (board_id, live posts) for every live board and
+        `hourly_counts` (board_id, start of the hour, live posts created in
+        that hour) for the last `retention_hours()`. Raises RedisError.
+        """
+        buckets: Dict[int, Dict[int, int]] = {}
+        for board_id, hour_start, post_count in hourly_counts:
+            bucket = buckets.setdefault(BoardLeaderboard.hour_of(hour_start), {})
+            bucket[board_id] = bucket.get(board_id, 0) + post_count
+
+        redis = await RedisManager.get_connection()
+        staging = f"{BoardLeaderboard.ALL_TIME_KEY}:staging"
+        await redis.delete(staging)
+        chunk: Dict[int, int] = {}
+        for board_id, post_count in post_counts:
+            chunk[board_id] = post_count
+            if len(chunk) == BoardLeaderboard.REBUILD_CHUNK_SIZE:
+                await redis.zadd(staging, chunk)
+                chunk = {}
+        if chunk:
+            await redis.zadd(staging, chunk)
+
+        current = BoardLeaderboard.hour_of(datetime.now())
+        async with redis.pipeline(transaction=True) as pipe:
+            if await redis.exists(staging):
+                pipe.rename(staging, BoardLeaderboard.ALL_TIME_KEY)
+            else:
+                pipe.delete(BoardLeaderboard.ALL_TIME_KEY)
+            for age in range(BoardLeaderboard.retention_hours()):
+                hour = current - age
+                pipe.delete(self.bucket_key(hour))
+                if buckets.get(hour):
+                    pipe.zadd(self.bucket_key(hour), buckets[hour])
+                    pipe.expire(self.bucket_key(hour), self.bucket_ttl(hour))
+            for window in BoardLeaderboard.WINDOWS:
+                pipe.delete(f"{BoardLeaderboard.WINDOW_PREFIX}{window}")
+            pipe.set(BoardLeaderboard.BUILT_KEY, int(time.time()))
+            await pipe.execute()
+
+    async def _reconcile(self, rebuild: Callable[[], Awaitable[None]]):
+        while True:
+            try:
+                redis = await RedisManager.get_connection()
+                # one worker per interval does the rebuild
+                locked = await redis.set(
+                    BoardLeaderboard.LOCK_KEY,
+                    os.getpid(),
+                    nx=True,
+                    ex=max(BoardLeaderboard.RECONCILE_SECONDS - 1, 1),
+                )
+                if locked:
+                    await rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Leaderboard reconciliation failed: {e}")
+            await asyncio.sleep(BoardLeaderboard.RECONCILE_SECONDS)
+
+    def start(self, rebuild: Callable[[], Awaitable[None]]):
+        """Run `rebuild` now and then every RECONCILE_SECONDS, on one worker
+        at a time; RECONCILE_SECONDS=0 disables it."""
+        if self._reconciler is None and BoardLeaderboard.RECONCILE_SECONDS > 0:
+            self._reconciler = asyncio.create_task(self._reconcile(rebuild))
+
+    async def stop(self):
+        if self._reconciler is not None:
+            self._reconciler.cancel()
+            try:
+                await self._reconciler
+            except asyncio.CancelledError:
+                pass
+            self._reconciler = None
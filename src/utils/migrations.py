@@ -0,0 +1,39 @@
+import os
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "alembic")
+
+
+class SchemaRevisionMismatch(RuntimeError):
+    pass
+
+
+def expected_heads() -> set:
+    """Head revision(s) of the migrations shipped with this code."""
+    return set(ScriptDirectory(ALEMBIC_DIR).get_heads())
+
+
+async def check_schema_revision(engine: AsyncEngine):
+    """Raise SchemaRevisionMismatch unless the database is migrated to head.
+
+    One SELECT on alembic_version, no catalog introspection.
+    """
+    expected = expected_heads()
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = {row.version_num for row in result}
+    except DBAPIError:
+        # no alembic_version table, the database was never migrated
+        current = set()
+
+    if current != expected:
+        raise SchemaRevisionMismatch(
+            f"database is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"this code expects {', '.join(sorted(expected))}; "
+            "run `alembic upgrade head` first"
+        )
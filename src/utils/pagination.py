@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from fastapi import HTTPException
+
+# Response header carrying the cursor of the next page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the keyset values of the last row into an opaque cursor."""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Any) -> List[Any]:
+    """Decode a cursor produced by `encode_cursor` back into its keyset values.
+
+    `types` holds the expected type (or tuple of types) of each value; a
+    cursor of another length or with a value of another type is rejected
+    with 400, so it never reaches the query.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("unexpected cursor shape")
+        values = [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    for value, expected in zip(values, types):
+        # JSON true/false would pass as the ints 1/0
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
@@ -0,0 +1,152 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+import asyncio
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class PostPartitions:
+    """Monthly partitions of the posts table on Postgres.
+
+    `ensure` creates the partitions from the current month through
+    MONTHS_AHEAD months ahead through the create_posts_partitions() function
+    of migration a3f6c9e1d7b4. Every worker runs it at startup and then
+    every MAINTENANCE_SECONDS; the function is idempotent and serialized
+    with an advisory lock. On other databases, or before the migration, it
+    does nothing.
+
+    Old partitions are taken out of the table with `detach`, see
+    scripts/posts_partitions.py.
+    """
+
+    MONTHS_AHEAD = int(os.getenv("POST_PARTITIONS_MONTHS_AHEAD", "3"))
+    MAINTENANCE_SECONDS = int(os.getenv("POST_PARTITIONS_MAINTENANCE_SECONDS", "21600"))
+    ARCHIVE_SCHEMA = os.getenv("POST_PARTITIONS_ARCHIVE_SCHEMA", "archive")
+    # posts_pYYYY_MM holds the posts created that month
+    NAME_PATTERN = re.compile(r"^posts_p(\d{4})_(\d{2})$")
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._maintenance: Optional[asyncio.Task] = None
+
+    async def is_partitioned(self, conn) -> bool:
+        if self.engine.dialect.name != "postgresql":
+            return False
+        result = await conn.execute(
+            text(
+                "SELECT to_regprocedure("
+                "'create_posts_partitions(timestamp, timestamp)') IS NOT NULL"
+            )
+        )
+        return result.scalar()
+
+    async def ensure(self) -> int:
+        """Create the missing current and future partitions; returns how many."""
+        async with self.engine.begin() as conn:
+            if not await self.is_partitioned(conn):
+                return 0
+            result = await conn.execute(
+                text(
+                    "SELECT create_posts_partitions("
+                    "now()::timestamp, "
+                    "now()::timestamp + make_interval(months => :months))"
+                ),
+                {"months": PostPartitions.MONTHS_AHEAD},
+            )
+            return result.scalar()
+
+    async def partitions(self) -> List[Tuple[str, date]]:
+        """(name, first day of its month) of the attached partitions, oldest first."""
+        async with self.engine.connect() as conn:
+            if not await self.is_partitioned(conn):
+                return []
+            result = await conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'posts'::regclass"
+                )
+            )
+            names = result.scalars().all()
+
+        partitions = []
+        for name in names:
+            match = PostPartitions.NAME_PATTERN.match(name)
+            if match:
+                month = date(int(match.group(1)), int(match.group(2)), 1)
+                partitions.append((name, month))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    async def detach(self, name: str):
+        """Detach partition `name` from posts and move it to ARCHIVE_SCHEMA.
+
+        Its posts disappear from the application but stay queryable as
+        `{ARCHIVE_SCHEMA}.{name}`. On Postgres 14+ the detach does not block
+        reads and writes of the other partitions.
+        """
+        async with self.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            version = (await conn.execute(text("SHOW server_version_num"))).scalar()
+            concurrently = " CONCURRENTLY" if int(version) >= 140000 else ""
+            await conn.execute(
+                text(f'ALTER TABLE posts DETACH PARTITION "{name}"{concurrently}')
+            )
+            await conn.execute(
+                text(f'CREATE SCHEMA IF NOT EXISTS "{PostPartitions.ARCHIVE_SCHEMA}"')
+            )
+            await conn.execute(
+                text(
+                    f'ALTER TABLE "{name}" SET SCHEMA "{PostPartitions.ARCHIVE_SCHEMA}"'
+                )
+            )
+
+    async def export(self, name: str, path: str) -> str:
+        """COPY the archived partition `name` to a CSV file at `path`."""
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            return await raw.driver_connection.copy_from_table(
+                name,
+                schema_name=PostPartitions.ARCHIVE_SCHEMA,
+                output=path,
+                format="csv",
+                header=True,
+            )
+
+    async def drop(self, name: str):
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text(f'DROP TABLE "{PostPartitions.ARCHIVE_SCHEMA}"."{name}"')
+            )
+
+    async def _maintain(self):
+        while True:
+            try:
+                created = await self.ensure()
+                if created:
+                    print(f"Created {created} posts partition(s)")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Posts partition maintenance failed: {e}")
+            await asyncio.sleep(PostPartitions.MAINTENANCE_SECONDS)
+
+    def start(self):
+        if self._maintenance is None and self.engine.dialect.name == "postgresql":
+            self._maintenance = asyncio.create_task(self._maintain())
+
+    async def stop(self):
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            try:
+                await self._maintenance
+            except asyncio.CancelledError:
+                pass
+            self._maintenance = None
@@ -0,0 +1,54 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+
+class PasswordHasher:
+    """Runs passlib hashing on a bounded thread pool instead of the event loop.
+
+    bcrypt releases the GIL, so `workers` threads hash in parallel while the
+    loop keeps serving other requests. At most `max_pending` jobs may be
+    running or queued; later callers wait up to `queue_timeout` seconds for a
+    slot and then get a 503, so a login storm queues instead of piling up.
+    """
+
+    def __init__(
+        self,
+        context: CryptContext,
+        workers: int,
+        max_pending: int,
+        queue_timeout: float,
+    ):
+        self.context = context
+        self.queue_timeout = queue_timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self.admission = asyncio.Semaphore(max_pending)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def _run(self, fn, *args):
+        try:
+            await asyncio.wait_for(self.admission.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password checks, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.admission.release()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
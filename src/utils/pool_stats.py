@@ -0,0 +1,69 @@
+import bisect
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """Checkout counters and a cumulative histogram of checkout wait times."""
+
+    # seconds, Prometheus style "le" upper bounds
+    BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_sum = 0.0
+        self.wait_counts = [0] * (len(PoolStats.BUCKETS) + 1)
+
+    def observe_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_sum += seconds
+        self.wait_counts[bisect.bisect_left(PoolStats.BUCKETS, seconds)] += 1
+
+    def wait_histogram(self):
+        cumulative = 0
+        histogram = []
+        for bound, count in zip(PoolStats.BUCKETS + ("+Inf",), self.wait_counts):
+            cumulative += count
+            histogram.append({"le": bound, "count": cumulative})
+        return histogram
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every checkout, including the time
+    spent queueing for a free connection or opening a new one."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.observe_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the counters
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def snapshot(self) -> dict:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.stats.checkouts,
+            "timeouts": self.stats.timeouts,
+            "wait_seconds_sum": self.stats.wait_seconds_sum,
+            "wait_seconds_histogram": self.stats.wait_histogram(),
+        }
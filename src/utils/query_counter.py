@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCount:
+    __slots__ = ("statements",)
+
+    def __init__(self):
+        self.statements = 0
+
+
+_current: ContextVar[Optional[QueryCount]] = ContextVar("query_count", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    counter = _current.get()
+    if counter is not None:
+        counter.statements += 1
+
+
+def install(engine: AsyncEngine):
+    """Count every SQL statement `engine` sends while a counter is active."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@contextmanager
+def count_queries():
+    """Count the statements sent by the code run inside the block, including
+    requests served in process (httpx.ASGITransport) from it."""
+    counter = QueryCount()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
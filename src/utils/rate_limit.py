@@ -0,0 +1,97 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+import math
+import time
+
+from fastapi import Depends, HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from schemas import Principal
+from services.users import UserService
+from utils.redis_manager import RedisManager
+
+# Token bucket: `capacity` requests at once, refilled at `rate` per second.
+# Returns {allowed, seconds until the next token as a string}.
+TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RateLimit:
+    """Per-route token bucket kept in Redis, one EVALSHA per request.
+
+    The limit is "<requests>/<seconds>", overridable per route through
+    RATE_LIMIT_<NAME> (e.g. RATE_LIMIT_POSTS_CREATE=30/60). When Redis is
+    unreachable requests are let through.
+    """
+
+    ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+
+    def __init__(self, name: str, default: str):
+        self.name = name
+        requests, seconds = os.getenv(f"RATE_LIMIT_{name.upper()}", default).split("/")
+        self.capacity = int(requests)
+        self.rate = self.capacity / float(seconds)
+        self._script = None
+        self._script_client = None
+
+    async def hit(self, identity: str):
+        if not RateLimit.ENABLED:
+            return
+
+        try:
+            redis = await RedisManager.get_connection()
+            if self._script_client is not redis:
+                self._script = redis.register_script(TOKEN_BUCKET)
+                self._script_client = redis
+            allowed, retry_after = await self._script(
+                keys=[f"ratelimit:{self.name}:{identity}"],
+                args=[self.capacity, self.rate, time.time()],
+            )
+        except RedisError:
+            return
+
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(float(retry_after))))},
+            )
+
+
+class UserRateLimit(RateLimit):
+    """Route dependency limiting each authenticated user."""
+
+    async def __call__(self, principal: Principal = Depends(UserService.get_principal)):
+        await self.hit(f"user:{principal.user_id}")
+
+
+class ClientRateLimit(RateLimit):
+    """Route dependency limiting each client address, for anonymous routes."""
+
+    async def __call__(self, request: Request):
+        await self.hit(f"ip:{request.client.host if request.client else 'unknown'}")
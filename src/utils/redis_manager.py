@@ -0,0 +1,80 @@
+from dotenv import load_dotenv
+import os
+
+dotenv_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+load_dotenv(dotenv_path)
+
+from time import perf_counter
+
+from redis import asyncio as aioredis
+from redis.asyncio.client import Pipeline
+
+from utils import metrics
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """Adds each command's count and latency to the current request's metrics."""
+
+    async def execute_command(self, *args, **options):
+        sample = metrics.current_sample()
+        if sample is None:
+            return await super().execute_command(*args, **options)
+
+        started = perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            sample.redis_commands += 1
+            sample.redis_seconds += perf_counter() - started
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedPipeline(Pipeline):
+    """Adds a pipeline's queued commands and its round-trip to the current
+    request's metrics when it is executed."""
+
+    async def execute(self, raise_on_error: bool = True):
+        sample = metrics.current_sample()
+        if sample is None:
+            return await super().execute(raise_on_error)
+
+        commands = len(self.command_stack)
+        started = perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            sample.redis_commands += commands
+            sample.redis_seconds += perf_counter() - started
+
+
+class RedisManager:
+    """One Redis client, and so one connection pool, per worker process."""
+
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:25100/0")
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    # seconds to wait for a free connection once the pool is exhausted
+    REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+
+    _connection = None
+
+    @classmethod
+    async def get_connection(cls):
+        if cls._connection is None:
+            pool = aioredis.BlockingConnectionPool.from_url(
+                cls.REDIS_URL,
+                decode_responses=True,
+                max_connections=cls.REDIS_MAX_CONNECTIONS,
+                timeout=cls.REDIS_POOL_TIMEOUT,
+            )
+            cls._connection = InstrumentedRedis(connection_pool=pool)
+        return cls._connection
+
+    @classmethod
+    async def close(cls):
+        if cls._connection is not None:
+            await cls._connection.close(close_connection_pool=True)
+            cls._connection = None
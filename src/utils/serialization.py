@@ -0,0 +1,28 @@
+from typing import Mapping, Optional
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def json_response(
+    adapter: TypeAdapter, value, headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """Response with `value` encoded to bytes by pydantic-core.
+
+    Routes returning a Response skip FastAPI's response_model pass, so the
+    value must already be validated (e.g. by `adapter.validate_python`); the
+    response_model is then only used for the OpenAPI schema.
+    """
+    return Response(
+        adapter.dump_json(value), media_type=JSON_MEDIA_TYPE, headers=headers
+    )
+
+
+def model_response(
+    model: BaseModel, headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    return Response(
+        model.model_dump_json(), media_type=JSON_MEDIA_TYPE, headers=headers
+    )
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from redis.exceptions import RedisError
+
+from utils.redis_manager import RedisManager
+
+
+class SessionRevocations:
+    """Per-worker set of revoked session ids (the token's `jti`).
+
+    A revocation is stored in Redis as `revoked:{jti}` until the token would
+    have expired, and published on CHANNEL. Every worker subscribes to the
+    channel and keeps the ids in memory, so checking a token costs a dict
+    lookup and no Redis round-trip. The set is reloaded from Redis whenever
+    the subscription (re)connects, which covers revocations published while
+    it was down. Without a live subscription, checks fall back to asking
+    Redis directly and fail open if Redis is unreachable.
+    """
+
+    CHANNEL = "auth:revoked"
+    KEY_PREFIX = "revoked:"
+    RECONNECT_SECONDS = 1.0
+
+    def __init__(self):
+        # jti -> token expiry (epoch seconds)
+        self._revoked: Dict[str, float] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.subscribed = False
+
+    def _add(self, session_id: str, expires_at: float):
+        now = time.time()
+        if expires_at <= now:
+            return
+        self._revoked[session_id] = expires_at
+        if len(self._revoked) % 1024 == 0:
+            self._revoked = {
+                jti: expiry for jti, expiry in self._revoked.items() if expiry > now
+            }
+
+    async def is_revoked(self, session_id: Optional[str]) -> bool:
+        if session_id is None:
+            return False
+        if session_id in self._revoked:
+            return True
+        if self.subscribed:
+            return False
+
+        try:
+            redis = await RedisManager.get_connection()
+            return bool(await redis.exists(SessionRevocations.KEY_PREFIX + session_id))
+        except RedisError:
+            return False
+
+    async def revoke(self, session_id: str, expires_at: float):
+        """Revoke a session on every worker; raises RedisError."""
+        self._add(session_id, expires_at)
+        ttl = max(int(expires_at - time.time()), 1)
+        redis = await RedisManager.get_connection()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(SessionRevocations.KEY_PREFIX + session_id, expires_at, ex=ttl)
+            pipe.publish(SessionRevocations.CHANNEL, f"{session_id} {expires_at}")
+            await pipe.execute()
+
+    async def _load(self, redis):
+        async for key in redis.scan_iter(match=SessionRevocations.KEY_PREFIX + "*"):
+            expires_at = await redis.get(key)
+            if expires_at is not None:
+                self._add(key[len(SessionRevocations.KEY_PREFIX) :], float(expires_at))
+
+    async def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                redis = await RedisManager.get_connection()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(SessionRevocations.CHANNEL)
+                await self._load(redis)
+                self.subscribed = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        session_id, expires_at = message["data"].split(" ")
+                        self._add(session_id, float(expires_at))
+            except RedisError as e:
+                print(f"Session revocation listener disconnected: {e}")
+            finally:
+                self.subscribed = False
+                if pubsub is not None:
+                    await pubsub.close()
+            await asyncio.sleep(SessionRevocations.RECONNECT_SECONDS)
+
+    def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
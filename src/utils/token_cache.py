@@ -0,0 +1,43 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from schemas import Principal
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of already-verified tokens, keyed by the token's digest.
+
+    Entries are dropped once their `exp` has passed, so an expired token is
+    always decoded again (and rejected) instead of being served from here.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Principal]" = OrderedDict()
+
+    def get(self, token_digest: str) -> Optional[Principal]:
+        principal = self._entries.get(token_digest)
+        if principal is None:
+            return None
+
+        if principal.expires_at is not None and principal.expires_at <= time.time():
+            del self._entries[token_digest]
+            return None
+
+        self._entries.move_to_end(token_digest)
+        return principal
+
+    def put(self, principal: Principal):
+        if principal.expires_at is None or self.maxsize <= 0:
+            return
+        self._entries[principal.token_digest] = principal
+        self._entries.move_to_end(principal.token_digest)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, token_digest: str):
+        self._entries.pop(token_digest, None)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+# the app modules read their settings at import time
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), "fastapi_crud_tests.db")
+os.environ["DB_URL"] = f"sqlite+aiosqlite:///{SCRATCH_DB}"
+os.environ.pop("DB_REPLICA_URLS", None)
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+
+import fakeredis
+import httpx
+import pytest
+
+import main
+from database import engine
+from models import Base
+from services.posts import PostService
+from utils.redis_manager import InstrumentedRedis, RedisManager
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def redis():
+    connection = InstrumentedRedis(
+        connection_pool=fakeredis.FakeAsyncRedis(decode_responses=True).connection_pool
+    )
+    RedisManager._connection = connection
+    yield connection
+    RedisManager._connection = None
+    await connection.close(close_connection_pool=True)
+
+
+@pytest.fixture
+async def client(redis):
+    """The app in process on an empty SQLite database and fakeredis."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        yield api
+
+    await PostService.cascade_jobs.stop()
+    await engine.dispose()
+
+
+async def login(client, email: str) -> dict:
+    """Sign up `email` and return its Authorization header."""
+    response = await client.post(
+        "/users/signup",
+        json={"fullname": email.split("@")[0], "email": email, "password": "password"},
+    )
+    assert response.status_code == 200, response.text
+    response = await client.post(
+        "/users/login", json={"email": email, "password": "password"}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
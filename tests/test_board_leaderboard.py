@@ -0,0 +1,138 @@
+import pytest
+
+from conftest import login
+from services.boards import BoardService
+
+
+async def create_boards(client, headers):
+    """Twelve boards where board i has i posts; the eight most active are
+    private. Returns the public board ids, most active first."""
+    public = []
+    for i in range(1, 13):
+        is_public = i <= 4
+        response = await client.post(
+            "/boards/create",
+            json={"name": f"board {i}", "is_public": is_public},
+            headers=headers,
+        )
+        board_id = response.json()["board_id"]
+        response = await client.post(
+            "/posts/bulk",
+            params={"board_id": board_id},
+            json=[{"title": f"post {n}", "content": "content"} for n in range(i)],
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+        if is_public:
+            public.insert(0, board_id)
+    return public
+
+
+async def walk(client, headers, **params):
+    """Every page of /boards/list followed through its cursors."""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, cursor=cursor) if cursor else params
+        response = await client.get("/boards/list", params=query, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([board["board_id"] for board in response.json()])
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+
+
+@pytest.mark.anyio
+async def test_rank_cursor_skips_private_boards_without_short_pages(client):
+    owner = await login(client, "owner@example.com")
+    reader = await login(client, "reader@example.com")
+    public = await create_boards(client, owner)
+    await BoardService.reconcile_leaderboard()
+
+    pages = await walk(client, reader, size=2)
+    assert pages == [public[:2], public[2:]]
+
+
+@pytest.mark.anyio
+async def test_scan_limit_gives_short_pages_but_no_duplicates(client, monkeypatch):
+    owner = await login(client, "owner@example.com")
+    reader = await login(client, "reader@example.com")
+    public = await create_boards(client, owner)
+    await BoardService.reconcile_leaderboard()
+    monkeypatch.setattr(BoardService, "LIST_MAX_SCAN", 3)
+
+    pages = await walk(client, reader, size=2)
+    assert [board_id for page in pages for board_id in page] == public
+    assert all(len(page) <= 2 for page in pages)
+
+
+@pytest.mark.anyio
+async def test_page_numbers_use_the_database_ranking(client):
+    owner = await login(client, "owner@example.com")
+    reader = await login(client, "reader@example.com")
+    public = await create_boards(client, owner)
+    await BoardService.reconcile_leaderboard()
+
+    for page in (1, 2, 3):
+        response = await client.get(
+            "/boards/list", params={"page": page, "size": 2}, headers=reader
+        )
+        assert [board["board_id"] for board in response.json()] == public[
+            (page - 1) * 2 : page * 2
+        ]
+
+    response = await client.get(
+        "/boards/list", params={"page": 2, "window": "24h"}, headers=reader
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_rebuild_counts_recent_posts_per_hour(client, redis):
+    owner = await login(client, "owner@example.com")
+    public = await create_boards(client, owner)
+    await redis.flushall()
+    await BoardService.reconcile_leaderboard()
+
+    # one bucket, or two when the posts were created across an hour boundary
+    totals = {}
+    for key in await redis.keys(f"{BoardService.leaderboard.BUCKET_PREFIX}*"):
+        for board_id, score in await redis.zrange(key, 0, -1, withscores=True):
+            totals[board_id] = totals.get(board_id, 0) + score
+    assert sorted(totals.values()) == [float(i) for i in range(1, 13)]
+
+    response = await client.get(
+        "/boards/list", params={"window": "24h", "size": 12}, headers=owner
+    )
+    assert [board["board_id"] for board in response.json()][-4:] == public
+
+
+@pytest.mark.anyio
+async def test_page_numbers_with_tied_counts(client):
+    """Redis breaks ties by member string ("9" before "12"), the database by
+    board id: numbered pages must all come from the database."""
+    owner = await login(client, "owner@example.com")
+    board_ids = []
+    for i in range(12):
+        response = await client.post(
+            "/boards/create",
+            json={"name": f"tied {i}", "is_public": True},
+            headers=owner,
+        )
+        board_ids.append(response.json()["board_id"])
+    await BoardService.reconcile_leaderboard()
+
+    pages = []
+    for page in (1, 2, 3):
+        response = await client.get(
+            "/boards/list", params={"page": page, "size": 5}, headers=owner
+        )
+        pages.append([board["board_id"] for board in response.json()])
+    assert pages == [
+        sorted(board_ids, reverse=True)[start : start + 5] for start in (0, 5, 10)
+    ]
+
+    walked = [
+        board_id for page in await walk(client, owner, size=5) for board_id in page
+    ]
+    assert sorted(walked) == sorted(board_ids)
@@ -0,0 +1,42 @@
+import httpx
+import pytest
+
+import main
+from utils import internal_access
+
+INTERNAL_PATHS = ["/internal/cache", "/internal/pool", "/metrics"]
+
+
+@pytest.fixture
+async def outside_client(client):
+    """The app as reached from an address outside INTERNAL_ALLOWED_NETWORKS."""
+    transport = httpx.ASGITransport(app=main.app, client=("203.0.113.7", 40000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        yield api
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+async def test_internal_endpoints_allow_loopback(client, path):
+    response = await client.get(path)
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+async def test_internal_endpoints_hidden_from_outside(outside_client, path):
+    response = await outside_client.get(path)
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+async def test_internal_token(outside_client, monkeypatch, path):
+    monkeypatch.setattr(internal_access, "INTERNAL_TOKEN", "scrape-token")
+
+    response = await outside_client.get(path, headers={"X-Internal-Token": "wrong"})
+    assert response.status_code == 404
+    response = await outside_client.get(
+        path, headers={"X-Internal-Token": "scrape-token"}
+    )
+    assert response.status_code == 200, response.text
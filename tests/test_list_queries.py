@@ -0,0 +1,69 @@
+"""List endpoints must not go back to the database per row (N+1)."""
+import pytest
+
+from conftest import login
+from services.boards import BoardService
+from utils.query_counter import count_queries
+
+
+async def statements(client, redis, path, headers, **params) -> int:
+    """SQL statements sent by one GET with the entity caches emptied."""
+    for key in await redis.keys("cache:*"):
+        await redis.delete(key)
+    with count_queries() as counter:
+        response = await client.get(path, params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return counter.statements
+
+
+async def add_posts(client, headers, board_id, count):
+    response = await client.post(
+        "/posts/bulk",
+        params={"board_id": board_id},
+        json=[{"title": f"post {i}", "content": "content"} for i in range(count)],
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["post_ids"]
+
+
+@pytest.mark.anyio
+async def test_list_statements_do_not_grow_with_rows(client, redis):
+    headers = await login(client, "lists@example.com")
+    # /boards/list on its leaderboard path
+    await BoardService.reconcile_leaderboard()
+    board = await client.post(
+        "/boards/create", json={"name": "first", "is_public": True}, headers=headers
+    )
+    board_id = board.json()["board_id"]
+    post_ids = await add_posts(client, headers, board_id, 1)
+
+    def requests():
+        ids = ",".join(map(str, post_ids))
+        return {
+            "/boards/list": {"size": 50},
+            "/posts/list": {"board_id": board_id, "size": 50},
+            f"/boards/detail/{board_id}": {"posts": 50},
+            "/posts/batch": {"ids": ids},
+            "/boards/batch": {"ids": str(board_id)},
+        }
+
+    before = {
+        path: await statements(client, redis, path, headers, **params)
+        for path, params in requests().items()
+    }
+
+    for i in range(5):
+        await client.post(
+            "/boards/create",
+            json={"name": f"more {i}", "is_public": True},
+            headers=headers,
+        )
+    post_ids += await add_posts(client, headers, board_id, 30)
+
+    after = {
+        path: await statements(client, redis, path, headers, **params)
+        for path, params in requests().items()
+    }
+    assert after == before
+    assert max(after.values()) <= 2
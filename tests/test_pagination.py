@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from conftest import login
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_decode_cursor_round_trip():
+    created_at = datetime(2026, 1, 2, 3, 4, 5)
+    cursor = encode_cursor(created_at, 7)
+    assert decode_cursor(cursor, datetime, int) == [created_at, 7]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64 json",
+        raw_cursor([1, 2, 3]),
+        raw_cursor({"dt": "2026-01-01"}),
+        raw_cursor(["2026-01-01", 1]),
+        raw_cursor([{"dt": "2026-01-01"}, "1"]),
+        raw_cursor([{"dt": "2026-01-01"}, True]),
+        raw_cursor([{"dt": "yesterday"}, 1]),
+        raw_cursor([{"dt": "2026-01-01"}, [1]]),
+    ],
+)
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, datetime, int)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/posts/list", {"board_id": 1, "size": 0}),
+        ("/posts/list", {"board_id": 1, "size": 101}),
+        ("/posts/list", {"board_id": 1, "page": 0}),
+        ("/posts/list", {"board_id": 1, "page": -1}),
+        ("/posts/search", {"q": "x", "size": 0}),
+        ("/boards/list", {"size": 0}),
+        ("/boards/list", {"size": -5}),
+        ("/boards/list", {"page": 0}),
+    ],
+)
+async def test_list_rejects_out_of_range_page_and_size(client, path, params):
+    headers = await login(client, "pager@example.com")
+    response = await client.get(path, params=params, headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/posts/list", {"board_id": 1, "cursor": raw_cursor([{"dt": "2026"}, "x"])}),
+        ("/boards/list", {"cursor": raw_cursor(["x", 1])}),
+        ("/boards/list", {"cursor": raw_cursor(["rank", -10])}),
+        ("/boards/list", {"cursor": raw_cursor([{"a": 1}, 1])}),
+    ],
+)
+async def test_list_rejects_bad_cursor(client, path, params):
+    headers = await login(client, "cursor@example.com")
+    await client.post(
+        "/boards/create", json={"name": "board", "is_public": True}, headers=headers
+    )
+    response = await client.get(path, params=params, headers=headers)
+    assert response.status_code == 400, response.text
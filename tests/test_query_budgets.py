@@ -0,0 +1,244 @@
+"""Most SQL statements each users/boards/posts endpoint may send.
+
+Every endpoint is called with the entity caches emptied, the cache-miss
+worst case, and its statement count checked against BUDGETS. A relationship
+lazily loaded per row shows up here as a list endpoint going from 1
+statement to 1 + N. New endpoints must be added to the table.
+
+The board leaderboard is built, so /boards/list is measured on its Redis
+path as well as on the database ranking (?page=N).
+"""
+import math
+import uuid
+
+import pytest
+from fastapi.routing import APIRoute
+
+import main
+from database import engine
+from services.boards import BoardService
+from services.posts import PostService
+from utils.query_counter import count_queries
+
+BUDGETS = {
+    ("POST", "/users/signup"): 2,
+    ("POST", "/users/login"): 1,
+    ("POST", "/users/token"): 1,
+    ("POST", "/users/logout"): 1,
+    ("POST", "/boards/create"): 3,
+    ("PUT", "/boards/update"): 3,
+    ("DELETE", "/boards/delete/{board_id}"): 2,
+    ("GET", "/boards/delete/{board_id}/status"): 0,
+    ("GET", "/boards/get/{board_id}"): 1,
+    ("GET", "/boards/batch"): 1,
+    ("GET", "/boards/detail/{board_id}"): 2,
+    ("GET", "/boards/{board_id}/export"): 2,
+    # database ranking 1; leaderboard page at most 2 hydration queries, see
+    # BoardService.ranked_boards
+    ("GET", "/boards/list"): 2,
+    ("POST", "/posts/create"): 2,
+    # board check and post_count update, plus SAVEPOINT, INSERT and RELEASE
+    # per batch
+    ("POST", "/posts/bulk"): 2
+    + 3 * math.ceil(PostService.BULK_MAX_POSTS / PostService.BULK_BATCH_SIZE),
+    ("PUT", "/posts/update"): 2,
+    ("DELETE", "/posts/delete/{post_id}"): 3,
+    ("GET", "/posts/get/{post_id}"): 1,
+    ("GET", "/posts/batch"): 1,
+    ("GET", "/posts/list"): 2,
+    ("GET", "/posts/search"): 1,
+}
+
+CHECKED_PREFIXES = ("/users/", "/boards/", "/posts/")
+
+# endpoints that need Postgres
+POSTGRES_ONLY = {("GET", "/posts/search")}
+
+
+class CountingClient:
+    def __init__(self, client, redis):
+        self.client = client
+        self.redis = redis
+        self.counts = {}
+
+    async def call(self, method, template, url=None, token=None, **options):
+        """Send one request with empty caches and record its statement count."""
+        for key in await self.redis.keys("cache:*"):
+            await self.redis.delete(key)
+
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        with count_queries() as counter:
+            response = await self.client.request(
+                method, url or template, headers=headers, **options
+            )
+        assert response.status_code < 400, (
+            f"{method} {url or template} failed with {response.status_code}: "
+            f"{response.text}"
+        )
+        self.counts[(method, template)] = max(
+            counter.statements, self.counts.get((method, template), 0)
+        )
+        return response
+
+
+async def exercise(api: CountingClient):
+    tag = uuid.uuid4().hex[:8]
+    users = []
+    for name in ("budget-owner", "budget-reader"):
+        email = f"{name}-{tag}@example.com"
+        await api.call(
+            "POST",
+            "/users/signup",
+            json={"fullname": name, "email": email, "password": "password"},
+        )
+        response = await api.call(
+            "POST", "/users/login", json={"email": email, "password": "password"}
+        )
+        users.append(response.json()["access_token"])
+    owner, reader = users
+    # ranks are then kept up to date by the writes below
+    await BoardService.reconcile_leaderboard()
+
+    await api.call(
+        "POST",
+        "/users/token",
+        data={"username": f"budget-owner-{tag}@example.com", "password": "password"},
+    )
+
+    board = (
+        await api.call(
+            "POST",
+            "/boards/create",
+            token=owner,
+            json={"name": f"budget-board-{tag}", "is_public": True},
+        )
+    ).json()
+    board_id = board["board_id"]
+    await api.call(
+        "PUT",
+        "/boards/update",
+        token=owner,
+        params={"board_id": board_id, "name": f"budget-board-{tag}-2", "public": True},
+    )
+
+    post = (
+        await api.call(
+            "POST",
+            "/posts/create",
+            token=owner,
+            params={"board_id": board_id, "title": "first", "content": "first post"},
+        )
+    ).json()
+    post_id = post["post_id"]
+    await api.call(
+        "POST",
+        "/posts/bulk",
+        token=owner,
+        params={"board_id": board_id},
+        json=[{"title": f"bulk {i}", "content": "bulk post"} for i in range(20)],
+    )
+    await api.call(
+        "PUT",
+        "/posts/update",
+        token=owner,
+        params={"post_id": post_id, "title": "edited", "content": "edited post"},
+    )
+
+    # private boards outranking the public one: a reader's one-board page
+    # reads past the first leaderboard chunk, and past a doubled second one
+    for i in range(3 * BoardService.LIST_OVERFETCH):
+        private = await api.call(
+            "POST",
+            "/boards/create",
+            token=owner,
+            json={"name": f"budget-private-{tag}-{i}", "is_public": False},
+        )
+        await api.call(
+            "POST",
+            "/posts/bulk",
+            token=owner,
+            params={"board_id": private.json()["board_id"]},
+            json=[{"title": f"private {n}", "content": "post"} for n in range(25)],
+        )
+    response = await api.call("GET", "/boards/list", token=reader, params={"size": 1})
+    assert [board["board_id"] for board in response.json()] == [board_id]
+
+    for token in (owner, reader):
+        await api.call("GET", "/boards/list", token=token, params={"size": 10})
+        await api.call(
+            "GET", "/boards/list", token=token, params={"page": 1, "size": 10}
+        )
+        await api.call(
+            "GET", "/boards/get/{board_id}", f"/boards/get/{board_id}", token=token
+        )
+        await api.call(
+            "GET",
+            "/boards/detail/{board_id}",
+            f"/boards/detail/{board_id}",
+            token=token,
+            params={"posts": 10},
+        )
+        await api.call(
+            "GET",
+            "/boards/{board_id}/export",
+            f"/boards/{board_id}/export",
+            token=token,
+        )
+        await api.call(
+            "GET",
+            "/posts/list",
+            token=token,
+            params={"board_id": board_id, "size": 10},
+        )
+    await api.call("GET", "/posts/get/{post_id}", f"/posts/get/{post_id}", token=owner)
+    await api.call(
+        "GET", "/posts/batch", token=owner, params={"ids": f"{post_id},{post_id + 1}"}
+    )
+    await api.call(
+        "GET", "/boards/batch", token=reader, params={"ids": f"{board_id},0"}
+    )
+    if engine.dialect.name == "postgresql":
+        await api.call("GET", "/posts/search", token=owner, params={"q": "bulk"})
+
+    await api.call(
+        "DELETE", "/posts/delete/{post_id}", f"/posts/delete/{post_id}", token=owner
+    )
+    await api.call(
+        "DELETE", "/boards/delete/{board_id}", f"/boards/delete/{board_id}", token=owner
+    )
+    await api.call(
+        "GET",
+        "/boards/delete/{board_id}/status",
+        f"/boards/delete/{board_id}/status",
+        token=owner,
+    )
+    await api.call("POST", "/users/logout", token=reader)
+
+
+def test_every_endpoint_has_a_budget():
+    endpoints = {
+        (method, route.path)
+        for route in main.app.routes
+        if isinstance(route, APIRoute) and route.path.startswith(CHECKED_PREFIXES)
+        for method in route.methods
+    }
+    assert endpoints - set(BUDGETS) == set()
+    assert set(BUDGETS) - endpoints == set()
+
+
+@pytest.mark.anyio
+async def test_endpoints_stay_within_budget(client, redis):
+    api = CountingClient(client, redis)
+    await exercise(api)
+
+    expected = set(BUDGETS)
+    if engine.dialect.name != "postgresql":
+        expected -= POSTGRES_ONLY
+    assert set(api.counts) == expected
+
+    over = {
+        endpoint: f"{statements} > {BUDGETS[endpoint]}"
+        for endpoint, statements in api.counts.items()
+        if statements > BUDGETS[endpoint]
+    }
+    assert over == {}
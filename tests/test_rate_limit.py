@@ -0,0 +1,52 @@
+import pytest
+from redis.exceptions import ConnectionError
+
+from conftest import login
+from routers.posts import bulk_rate_limit
+from utils.rate_limit import RateLimit
+
+
+@pytest.fixture
+async def board(client, monkeypatch):
+    """A board and its owner's headers, with rate limiting switched on."""
+    headers = await login(client, "limits@example.com")
+    response = await client.post(
+        "/boards/create", json={"name": "limits", "is_public": True}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    monkeypatch.setattr(RateLimit, "ENABLED", True)
+    monkeypatch.setattr(bulk_rate_limit, "capacity", 2)
+    monkeypatch.setattr(bulk_rate_limit, "rate", 2 / 60)
+    return response.json()["board_id"], headers
+
+
+async def bulk(client, board_id: int, headers: dict):
+    return await client.post(
+        "/posts/bulk",
+        params={"board_id": board_id},
+        json=[{"title": "bulk", "content": "bulk post"}],
+        headers=headers,
+    )
+
+
+@pytest.mark.anyio
+async def test_bulk_posts_are_rate_limited(client, board):
+    board_id, headers = board
+    for _ in range(2):
+        assert (await bulk(client, board_id, headers)).status_code == 200
+
+    response = await bulk(client, board_id, headers)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+
+
+@pytest.mark.anyio
+async def test_rate_limit_fails_open_without_redis(client, redis, board, monkeypatch):
+    board_id, headers = board
+
+    async def unreachable(*args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(redis, "evalsha", unreachable)
+    for _ in range(3):
+        assert (await bulk(client, board_id, headers)).status_code == 200
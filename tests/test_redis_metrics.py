@@ -0,0 +1,31 @@
+import pytest
+
+from utils import metrics
+from utils.redis_manager import InstrumentedPipeline
+
+
+@pytest.mark.anyio
+async def test_pipeline_commands_are_recorded(redis):
+    sample = metrics.RequestSample()
+    token = metrics._current.set(sample)
+    try:
+        await redis.set("single", 1)
+        async with redis.pipeline(transaction=False) as pipe:
+            assert isinstance(pipe, InstrumentedPipeline)
+            pipe.set("first", 1)
+            pipe.incr("second")
+            pipe.expire("second", 60)
+            assert await pipe.execute() == [True, 1, True]
+    finally:
+        metrics._current.reset(token)
+
+    assert sample.redis_commands == 4
+    assert sample.redis_seconds > 0
+
+
+@pytest.mark.anyio
+async def test_pipeline_outside_a_request(redis):
+    async with redis.pipeline() as pipe:
+        pipe.set("key", "value")
+        pipe.get("key")
+        assert await pipe.execute() == [True, "value"]
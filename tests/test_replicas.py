@@ -0,0 +1,126 @@
+import os
+
+import pytest
+from sqlalchemy import insert, select, update
+
+import database
+from database import ReplicaRouter, create_engine, execute_read, set_sticky_key
+from models import Base, Board, User
+from schemas import Principal
+from services.boards import BoardService
+
+
+async def seed(engine, name: str):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User).values(
+                id=1, fullname="owner", email="owner@example.com", hash_password="x"
+            )
+        )
+        await conn.execute(
+            insert(Board).values(
+                board_id=1, name=name, is_public=True, is_deleted=False, creator_id=1
+            )
+        )
+
+
+@pytest.fixture
+async def engines(tmp_path, monkeypatch):
+    """A primary and two replica SQLite files whose board 1 is named after
+    the database holding it, wired into the read routing."""
+    primary = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica_engines = [
+        create_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        for name in ("replica-a", "replica-b")
+    ]
+    try:
+        await seed(primary, "primary")
+        for replica, name in zip(replica_engines, ("replica-a", "replica-b")):
+            await seed(replica, name)
+
+        monkeypatch.setattr(database, "engine", primary)
+        monkeypatch.setattr(database, "replicas", ReplicaRouter(replica_engines))
+        yield primary, replica_engines
+    finally:
+        for each in (primary, *replica_engines):
+            await each.dispose()
+
+
+async def read_from(sticky_key=None) -> str:
+    """Name of the database that served one routed read."""
+    set_sticky_key(sticky_key)
+    async with database.session_create() as db:
+        result = await execute_read(db, select(Board.name).where(Board.board_id == 1))
+        return result.scalar_one()
+
+
+@pytest.mark.anyio
+async def test_reads_round_robin_over_replicas(engines):
+    served = [await read_from() for _ in range(4)]
+    assert sorted(served) == ["replica-a"] * 2 + ["replica-b"] * 2
+    assert served[0] != served[1] and served[1] != served[2]
+
+
+@pytest.mark.anyio
+async def test_writer_sticks_to_primary_after_write(engines):
+    set_sticky_key("writer")
+    async with database.session_create() as db:
+        await db.execute(update(Board).where(Board.board_id == 1).values(version=2))
+        # same session, before the commit
+        result = await execute_read(db, select(Board.name))
+        assert result.scalar_one() == "primary"
+        await db.commit()
+
+    assert [await read_from("writer") for _ in range(3)] == ["primary"] * 3
+    assert await read_from("someone else") != "primary"
+
+
+@pytest.mark.anyio
+async def test_sticky_window_expires(engines, monkeypatch):
+    monkeypatch.setattr(database, "REPLICA_STICKY_SECONDS", 0)
+    database.replicas.record_write("writer")
+    assert await read_from("writer") != "primary"
+
+
+@pytest.mark.anyio
+async def test_failed_replica_is_skipped_then_retried(tmp_path, engines, monkeypatch):
+    primary, (healthy, _) = engines
+    # the directory does not exist, so every connection attempt fails
+    down = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'down.db'}")
+    router = ReplicaRouter([down, healthy])
+    monkeypatch.setattr(database, "replicas", router)
+
+    # the statement is retried on the primary
+    assert await read_from() == "primary"
+    assert [await read_from() for _ in range(4)] == ["replica-a"] * 4
+
+    monkeypatch.setattr(database, "REPLICA_RETRY_SECONDS", 0)
+    router.mark_unhealthy(down)
+    os.makedirs(tmp_path / "missing")
+    await seed(down, "replica-down")
+    try:
+        served = {await read_from() for _ in range(2)}
+        assert served == {"replica-a", "replica-down"}
+    finally:
+        await down.dispose()
+
+
+@pytest.mark.anyio
+async def test_cached_lookup_reads_the_primary(engines, redis):
+    """A lagging replica must not put the row from before a write in the
+    shared cache."""
+    primary, _ = engines
+    async with primary.begin() as conn:
+        await conn.execute(
+            update(Board).where(Board.board_id == 1).values(name="renamed", version=2)
+        )
+    await BoardService.cache.invalidate(1)
+
+    principal = Principal(user_id=2, token_digest="reader")
+    set_sticky_key(principal.user_id)
+    async with database.session_create() as db:
+        board = await BoardService.get_board_from_id(db, 1, principal)
+    assert (board.name, board.version) == ("renamed", 2)
+    assert (await BoardService.cache.get(1)).name == "renamed"
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+
+from conftest import login
+from services.users import UserService
+
+
+@pytest.mark.anyio
+async def test_logout_revokes_only_that_token(client, redis):
+    first = await login(client, "sessions@example.com")
+    response = await client.post(
+        "/users/login", json={"email": "sessions@example.com", "password": "password"}
+    )
+    second = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # issuing a token writes nothing to Redis
+    assert await redis.keys("*") == []
+
+    response = await client.post("/users/logout", headers=first)
+    assert response.status_code == 200, response.text
+    assert len(await redis.keys("revoked:*")) == 1
+
+    response = await client.get("/boards/list", headers=first)
+    assert response.status_code == 401
+    response = await client.get("/boards/list", headers=second)
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.anyio
+async def test_logout_refuses_token_without_jti(client, redis):
+    issued = (await login(client, "legacy@example.com"))["Authorization"]
+    user_id = jwt.get_unverified_claims(issued.split()[1])["sub"]
+    # a token from before jti was added
+    token = jwt.encode(
+        {"sub": user_id, "exp": datetime.utcnow() + timedelta(minutes=5)},
+        UserService.SECRET_KEY,
+        algorithm=UserService.ALGORITHM,
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.post("/users/logout", headers=headers)
+    assert response.status_code == 400
+    assert "cannot be revoked" in response.json()["detail"]
+    assert await redis.keys("revoked:*") == []
+    response = await client.get("/boards/list", headers=headers)
+    assert response.status_code == 200, response.text